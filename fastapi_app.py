@@ -4,7 +4,7 @@ FastAPI Entry Point for S3 ACID Database
 Wraps Lambda handler for local development without Lambda emulator bugs
 """
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse, FileResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -87,9 +87,10 @@ async def health_check():
         "path": "/health"
     }
     response = lambda_handler(event, None)
-    return JSONResponse(
+    return Response(
         status_code=response["statusCode"],
-        content=json.loads(response["body"])
+        content=response["body"],
+        media_type="application/json"
     )
 
 
@@ -177,22 +178,24 @@ async def database_operation(request: Request):
     Main database endpoint - wraps Lambda handler
     Accepts any database operation and routes through Lambda handler logic
     """
-    body = await request.json()
+    # Forward the raw body: the handler parses it once, no decode/re-encode here
+    body = (await request.body()).decode("utf-8")
 
     # Convert FastAPI request to Lambda event format
     event = {
         "httpMethod": "POST",
         "path": "/database",
-        "body": json.dumps(body)
+        "body": body
     }
 
     # Call Lambda handler
     response = lambda_handler(event, None)
 
-    # Convert Lambda response to FastAPI response
-    return JSONResponse(
+    # Lambda body is already serialized JSON - pass it through as-is
+    return Response(
         status_code=response["statusCode"],
-        content=json.loads(response["body"])
+        content=response["body"],
+        media_type="application/json"
     )
 
 
@@ -123,7 +123,7 @@ class AuthContext:
     def is_write_operation(self, operation: str) -> bool:
         """Check if the operation is a write/mutating operation."""
         write_ops = {
-            'WRITE', 'UPDATE', 'DELETE', 'HARD_DELETE', 'UPSERT',
+            'WRITE', 'WRITE_BATCH', 'UPDATE', 'DELETE', 'HARD_DELETE', 'UPSERT',
             'CREATE_TABLE', 'DROP_TABLE', 'DROP_NAMESPACE', 'COMPACT',
             'VECTOR_WRITE', 'VECTOR_INDEX',
         }
@@ -13,38 +13,82 @@ import signal
 import traceback
 import time
 from typing import Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 
 from src.auth import authenticate, AuthContext
 
 # Use faster JSON library if available (3x faster)
 try:
     import orjson
-    def dumps_json(obj, default=str):
+    def dumps_json(obj, default=str, option=0):
         """Fast JSON serialization with orjson"""
-        return orjson.dumps(obj, default=default).decode('utf-8')
+        return orjson.dumps(obj, default=default, option=option).decode('utf-8')
+    def loads_json(data):
+        """Fast JSON parsing with orjson"""
+        return orjson.loads(data)
+    # Record rows render datetimes via default=str ("YYYY-MM-DD HH:MM:SS"), as json does
+    RECORDS_JSON_OPTION = orjson.OPT_PASSTHROUGH_DATETIME
     HAS_ORJSON = True
 except ImportError:
-    def dumps_json(obj, default=str):
+    def dumps_json(obj, default=str, option=0):
         """Fallback to standard json"""
         return json.dumps(obj, default=default)
+    def loads_json(data):
+        """Fallback to standard json"""
+        return json.loads(data)
+    RECORDS_JSON_OPTION = 0
     HAS_ORJSON = False
 
 # Import our type-safe models and operations
-from src.models import (
-    OperationType,
-    QueryRequest, WriteRequest, UpdateRequest, DeleteRequest, HardDeleteRequest, UpsertRequest,
-    CompactRequest,
-    CreateTableRequest, ListTablesRequest, DescribeTableRequest,
-    DropTableRequest, DropNamespaceRequest, ExportCsvRequest,
-    ExecuteSqlRequest, FederatedQueryRequest,
-    VectorSearchRequest, VectorWriteRequest, VectorIndexRequest
-)
+from src.models import OperationType, OPERATION_REQUEST_MODELS, REQUEST_ADAPTER
 # Use full Iceberg implementation with PyIceberg for writes and DuckDB for reads
 from src.operations_full_iceberg import DatabaseOperations
 from src.operations_storage import StorageOperations
 
 
+# ============================================================================
+# Operation Dispatch
+# ============================================================================
+
+def _vector_ops():
+    """Build VectorOperations bound to the shared Iceberg ops (lazy import)"""
+    from src.operations_vector import VectorOperations
+    from src.operations_full_iceberg import get_iceberg_ops
+    return VectorOperations(get_iceberg_ops)
+
+
+# Operations that map a validated request straight onto a response model.
+# EXECUTE_SQL and FEDERATED_QUERY build their own HTTP response and are
+# routed through RAW_RESPONSE_HANDLERS instead.
+OPERATION_HANDLERS = {
+    OperationType.QUERY: DatabaseOperations.query,
+    OperationType.WRITE: DatabaseOperations.write,
+    OperationType.WRITE_BATCH: DatabaseOperations.write_batch,
+    OperationType.UPDATE: DatabaseOperations.update,
+    OperationType.DELETE: DatabaseOperations.delete,
+    OperationType.HARD_DELETE: DatabaseOperations.hard_delete,
+    OperationType.UPSERT: DatabaseOperations.upsert,
+    OperationType.COMPACT: DatabaseOperations.compact,
+    OperationType.CREATE_TABLE: DatabaseOperations.create_table,
+    OperationType.LIST_TABLES: DatabaseOperations.list_tables,
+    OperationType.DESCRIBE_TABLE: DatabaseOperations.describe_table,
+    OperationType.DROP_TABLE: DatabaseOperations.drop_table,
+    OperationType.DROP_NAMESPACE: DatabaseOperations.drop_namespace,
+    OperationType.EXPORT_CSV: DatabaseOperations.export_csv,
+    OperationType.GET_UPLOAD_URL: StorageOperations.get_upload_url,
+    OperationType.GET_DOWNLOAD_URL: StorageOperations.get_download_url,
+    OperationType.GET_UPLOAD_URLS_BATCH: StorageOperations.get_upload_urls_batch,
+    OperationType.VECTOR_SEARCH: lambda request: _vector_ops().vector_search(request),
+    OperationType.VECTOR_WRITE: lambda request: _vector_ops().vector_write(request),
+    OperationType.VECTOR_INDEX: lambda request: _vector_ops().vector_index(request),
+}
+
+# Responses carrying raw table rows (pandas Timestamps, numpy scalars, NaT)
+# keep the orjson + default=str encoding; every other response is made of
+# known types and is serialized directly by pydantic-core.
+RECORD_OPERATIONS = frozenset({OperationType.QUERY, OperationType.VECTOR_SEARCH})
+
+
 # ============================================================================
 # Timeout Handler
 # ============================================================================
@@ -94,6 +138,122 @@ def _normalize_event(event: Dict[str, Any]) -> tuple[str, str]:
     return http_method, path
 
 
+def _handle_execute_sql(request, auth_ctx: AuthContext, request_id: str, start_time: float) -> Dict[str, Any]:
+    """Run raw SQL on the shared DuckDB connection and build the HTTP response"""
+    # Use the shared Iceberg ops DuckDB connection (already configured with catalog + S3)
+    from src.operations_full_iceberg import get_iceberg_ops
+    ops = get_iceberg_ops()
+
+    # Auto-register only referenced Iceberg tables as DuckDB views
+    # Parse SQL to find table names, then resolve only those via catalog
+    import re
+    namespace = request.namespace or "default"
+    iceberg_ns = ops._get_namespace(request.tenant_id, namespace)
+    sql_upper = request.sql.upper()
+    # Find table references after FROM/JOIN keywords
+    table_refs = set(re.findall(
+        r'(?:FROM|JOIN)\s+["\']?(\w+)["\']?', sql_upper
+    ))
+
+    # Row-level policy: if auth key has row_policy, filter views by user_id
+    row_filter_col = auth_ctx.get_row_filter_column()
+    row_filter_val = auth_ctx.get_row_filter_value()
+
+    if table_refs:
+        try:
+            catalog = ops._get_catalog()
+            known_tables = {t[1].upper(): t[1] for t in catalog.list_tables(iceberg_ns)}
+            for ref in table_refs:
+                actual_name = known_tables.get(ref)
+                if actual_name:
+                    try:
+                        table_id = f"{iceberg_ns}.{actual_name}"
+                        metadata_path = ops._get_metadata_path(table_id)
+                        base_scan = f"SELECT * FROM iceberg_scan('{metadata_path}')"
+
+                        # Apply row-level filter when policy is active
+                        if row_filter_col and row_filter_val:
+                            # Sanitize: only allow alphanumeric, hyphens, underscores, dots, @
+                            safe_val = ''.join(c for c in row_filter_val if c.isalnum() or c in '-_.@')
+                            view_sql = f'CREATE OR REPLACE VIEW "{actual_name}" AS {base_scan} WHERE "{row_filter_col}" = \'{safe_val}\''
+                            ops.conn.execute(view_sql)
+                            print(f"Auth: Row-level view for {actual_name} filtered by {row_filter_col}={safe_val}")
+                        else:
+                            ops.conn.execute(
+                                f'CREATE OR REPLACE VIEW "{actual_name}" AS {base_scan}'
+                            )
+                    except Exception as view_err:
+                        print(f"Warning: Could not register view for {actual_name}: {view_err}")
+        except Exception as catalog_err:
+            print(f"Warning: Could not resolve table views: {catalog_err}")
+
+    result = ops.conn.execute(request.sql, request.params or [])
+    columns = [desc[0] for desc in result.description]
+    rows = result.fetchall()
+    records = [dict(zip(columns, row)) for row in rows]
+    result_data = {
+        'success': True,
+        'data': {
+            'records': records,
+            'row_count': len(records),
+        },
+        'metadata': {'request_id': request_id}
+    }
+    execution_time_ms = (time.perf_counter() - start_time) * 1000
+    result_data['metadata']['execution_time_ms'] = round(execution_time_ms, 2)
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'X-Request-ID': request_id,
+        },
+        'body': dumps_json(result_data, default=str)
+    }
+
+
+def _handle_federated_query(request, auth_ctx: AuthContext, request_id: str, start_time: float) -> Dict[str, Any]:
+    """Run a federated query through ibexdb and build the HTTP response"""
+    from ibexdb import FederatedQueryEngine
+    engine = FederatedQueryEngine()
+    try:
+        # Configure additional sources if provided
+        if request.sources:
+            for source_id, source_config in request.sources.items():
+                engine.add_source(source_id, source_config.get('type', 'postgres'), source_config)
+        df = engine.execute_sql(request.sql, request.params)
+        records = df.to_dicts() if hasattr(df, 'to_dicts') else df.to_dict('records')
+        result_data = {
+            'success': True,
+            'data': {
+                'records': records,
+                'row_count': len(records),
+            },
+            'metadata': {'request_id': request_id}
+        }
+        execution_time_ms = (time.perf_counter() - start_time) * 1000
+        result_data['metadata']['execution_time_ms'] = round(execution_time_ms, 2)
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'X-Request-ID': request_id,
+            },
+            'body': dumps_json(result_data, default=str)
+        }
+    finally:
+        engine.close()
+
+
+# Dispatch table for operations whose handlers return a complete Lambda
+# response themselves instead of a response model.
+RAW_RESPONSE_HANDLERS = {
+    OperationType.EXECUTE_SQL: _handle_execute_sql,
+    OperationType.FEDERATED_QUERY: _handle_federated_query,
+}
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     AWS Lambda handler function
@@ -106,7 +266,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Returns:
         API Gateway response with status code and body
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
     request_id = context.aws_request_id if context else 'local-test'
     
     # Set up timeout protection (leave 5s buffer for cleanup)
@@ -119,7 +279,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     try:
         print(f"\n{'='*60}")
         print(f"Request ID: {request_id}")
-        print(f"Timestamp: {datetime.utcnow().isoformat()}Z")
+        print(f"Timestamp: {datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')}")
         print(f"{'='*60}\n")
         
         # Normalize event format (Lambda Function URL vs API Gateway)
@@ -127,7 +287,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         # Handle health check
         if http_method == 'GET' and path == '/health':
-            execution_time_ms = (time.time() - start_time) * 1000
+            execution_time_ms = (time.perf_counter() - start_time) * 1000
             print(f"✓ Health check completed in {execution_time_ms:.2f}ms")
             return {
                 'statusCode': 200,
@@ -164,7 +324,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if event.get('body'):
             # API Gateway / Function URL format
             if isinstance(event['body'], str):
-                request_data = json.loads(event['body'])
+                request_data = loads_json(event['body'])
             else:
                 request_data = event['body']
         elif event.get('operation'):
@@ -200,217 +360,45 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         print(f"Auth: key_id={auth_ctx.key_id}, permissions={auth_ctx.permissions}")
 
         # Route to appropriate handler
-        if operation == OperationType.QUERY:
-            request = QueryRequest(**request_data)
-            result = DatabaseOperations.query(request)
-
-        elif operation == OperationType.WRITE:
-            request = WriteRequest(**request_data)
-            result = DatabaseOperations.write(request)
-
-        elif operation == OperationType.UPDATE:
-            request = UpdateRequest(**request_data)
-            result = DatabaseOperations.update(request)
-
-        elif operation == OperationType.DELETE:
-            request = DeleteRequest(**request_data)
-            result = DatabaseOperations.delete(request)
-
-        elif operation == OperationType.HARD_DELETE:
-            request = HardDeleteRequest(**request_data)
-            result = DatabaseOperations.hard_delete(request)
-
-        elif operation == OperationType.UPSERT:
-            request = UpsertRequest(**request_data)
-            result = DatabaseOperations.upsert(request)
-
-        elif operation == OperationType.COMPACT:
-            request = CompactRequest(**request_data)
-            result = DatabaseOperations.compact(request)
-
-        elif operation == OperationType.CREATE_TABLE:
-            request = CreateTableRequest(**request_data)
-            result = DatabaseOperations.create_table(request)
-
-        elif operation == OperationType.LIST_TABLES:
-            request = ListTablesRequest(**request_data)
-            result = DatabaseOperations.list_tables(request)
-
-        elif operation == OperationType.DESCRIBE_TABLE:
-            request = DescribeTableRequest(**request_data)
-            result = DatabaseOperations.describe_table(request)
-
-        elif operation == OperationType.DROP_TABLE:
-            request = DropTableRequest(**request_data)
-            result = DatabaseOperations.drop_table(request)
-
-        elif operation == OperationType.DROP_NAMESPACE:
-            request = DropNamespaceRequest(**request_data)
-            result = DatabaseOperations.drop_namespace(request)
-
-        elif operation == OperationType.EXPORT_CSV:
-            request = ExportCsvRequest(**request_data)
-            result = DatabaseOperations.export_csv(request)
-
-        elif operation == OperationType.GET_UPLOAD_URL:
-            # Import models dynamically or use from import above
-            from src.models import GetUploadUrlRequest
-            request = GetUploadUrlRequest(**request_data)
-            result = StorageOperations.get_upload_url(request)
-
-        elif operation == OperationType.GET_DOWNLOAD_URL:
-            from src.models import GetDownloadUrlRequest
-            request = GetDownloadUrlRequest(**request_data)
-            result = StorageOperations.get_download_url(request)
-
-        elif operation == OperationType.EXECUTE_SQL:
-            request = ExecuteSqlRequest(**request_data)
-            # Use the shared Iceberg ops DuckDB connection (already configured with catalog + S3)
-            from src.operations_full_iceberg import get_iceberg_ops
-            ops = get_iceberg_ops()
-
-            # Auto-register only referenced Iceberg tables as DuckDB views
-            # Parse SQL to find table names, then resolve only those via catalog
-            import re
-            namespace = request.namespace or "default"
-            iceberg_ns = ops._get_namespace(request.tenant_id, namespace)
-            sql_upper = request.sql.upper()
-            # Find table references after FROM/JOIN keywords
-            table_refs = set(re.findall(
-                r'(?:FROM|JOIN)\s+["\']?(\w+)["\']?', sql_upper
-            ))
-
-            # Row-level policy: if auth key has row_policy, filter views by user_id
-            row_filter_col = auth_ctx.get_row_filter_column()
-            row_filter_val = auth_ctx.get_row_filter_value()
-
-            if table_refs:
-                try:
-                    catalog = ops._get_catalog()
-                    known_tables = {t[1].upper(): t[1] for t in catalog.list_tables(iceberg_ns)}
-                    for ref in table_refs:
-                        actual_name = known_tables.get(ref)
-                        if actual_name:
-                            try:
-                                table_id = f"{iceberg_ns}.{actual_name}"
-                                metadata_path = ops._get_metadata_path(table_id)
-                                base_scan = f"SELECT * FROM iceberg_scan('{metadata_path}')"
-
-                                # Apply row-level filter when policy is active
-                                if row_filter_col and row_filter_val:
-                                    # Sanitize: only allow alphanumeric, hyphens, underscores, dots, @
-                                    safe_val = ''.join(c for c in row_filter_val if c.isalnum() or c in '-_.@')
-                                    view_sql = f'CREATE OR REPLACE VIEW "{actual_name}" AS {base_scan} WHERE "{row_filter_col}" = \'{safe_val}\''
-                                    ops.conn.execute(view_sql)
-                                    print(f"Auth: Row-level view for {actual_name} filtered by {row_filter_col}={safe_val}")
-                                else:
-                                    ops.conn.execute(
-                                        f'CREATE OR REPLACE VIEW "{actual_name}" AS {base_scan}'
-                                    )
-                            except Exception as view_err:
-                                print(f"Warning: Could not register view for {actual_name}: {view_err}")
-                except Exception as catalog_err:
-                    print(f"Warning: Could not resolve table views: {catalog_err}")
-
-            result = ops.conn.execute(request.sql, request.params or [])
-            columns = [desc[0] for desc in result.description]
-            rows = result.fetchall()
-            records = [dict(zip(columns, row)) for row in rows]
-            result_data = {
-                'success': True,
-                'data': {
-                    'records': records,
-                    'row_count': len(records),
-                },
-                'metadata': {'request_id': request_id}
-            }
-            execution_time_ms = (time.time() - start_time) * 1000
-            result_data['metadata']['execution_time_ms'] = round(execution_time_ms, 2)
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'X-Request-ID': request_id,
-                },
-                'body': dumps_json(result_data, default=str)
-            }
-
-        elif operation == OperationType.FEDERATED_QUERY:
-            request = FederatedQueryRequest(**request_data)
-            from ibexdb import FederatedQueryEngine
-            engine = FederatedQueryEngine()
-            try:
-                # Configure additional sources if provided
-                if request.sources:
-                    for source_id, source_config in request.sources.items():
-                        engine.add_source(source_id, source_config.get('type', 'postgres'), source_config)
-                df = engine.execute_sql(request.sql, request.params)
-                records = df.to_dicts() if hasattr(df, 'to_dicts') else df.to_dict('records')
-                result_data = {
-                    'success': True,
-                    'data': {
-                        'records': records,
-                        'row_count': len(records),
-                    },
-                    'metadata': {'request_id': request_id}
-                }
-                execution_time_ms = (time.time() - start_time) * 1000
-                result_data['metadata']['execution_time_ms'] = round(execution_time_ms, 2)
-                return {
-                    'statusCode': 200,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*',
-                        'X-Request-ID': request_id,
-                    },
-                    'body': dumps_json(result_data, default=str)
-                }
-            finally:
-                engine.close()
-
-        elif operation == OperationType.VECTOR_SEARCH:
-            request = VectorSearchRequest(**request_data)
-            from src.operations_vector import VectorOperations
-            from src.operations_full_iceberg import get_iceberg_ops
-            vec_ops = VectorOperations(get_iceberg_ops)
-            result = vec_ops.vector_search(request)
-
-        elif operation == OperationType.VECTOR_WRITE:
-            request = VectorWriteRequest(**request_data)
-            from src.operations_vector import VectorOperations
-            from src.operations_full_iceberg import get_iceberg_ops
-            vec_ops = VectorOperations(get_iceberg_ops)
-            result = vec_ops.vector_write(request)
-
-        elif operation == OperationType.VECTOR_INDEX:
-            request = VectorIndexRequest(**request_data)
-            from src.operations_vector import VectorOperations
-            from src.operations_full_iceberg import get_iceberg_ops
-            vec_ops = VectorOperations(get_iceberg_ops)
-            result = vec_ops.vector_index(request)
-
-        else:
+        if operation not in OPERATION_REQUEST_MODELS:
             print(f"✗ Unknown operation: {operation}")
             return error_response(400, f'Unknown operation: {operation}', request_id)
 
+        request = REQUEST_ADAPTER.validate_python(request_data)
+
+        # Operations that build their own HTTP response (raw row payloads)
+        raw_handler = RAW_RESPONSE_HANDLERS.get(operation)
+        if raw_handler is not None:
+            return raw_handler(request, auth_ctx, request_id, start_time)
+
+        result = OPERATION_HANDLERS[operation](request)
+
         # Calculate execution time
-        execution_time_ms = (time.time() - start_time) * 1000
+        execution_time_ms = (time.perf_counter() - start_time) * 1000
         
         # Reconstruct response with proper metadata
         # The operation returns a response, but we need to add/update the metadata
         from src.models import ResponseMetadata
-        
-        response_body = result.model_dump() if hasattr(result, 'model_dump') else result.dict()
-        
+
         # Update metadata with actual request_id and execution_time
-        response_body['metadata'] = {
-            'request_id': request_id,
-            'execution_time_ms': round(execution_time_ms, 2)
-        }
-        
-        success = response_body.get('success', False)
-        status_code = 200 if success else 400
+        result.metadata = ResponseMetadata(
+            request_id=request_id,
+            execution_time_ms=round(execution_time_ms, 2)
+        )
+
+        if operation in RECORD_OPERATIONS:
+            body = dumps_json(result.model_dump(), default=str, option=RECORDS_JSON_OPTION)
+        else:
+            body = result.model_dump_json()
+
+        success = result.success
+        if success:
+            status_code = 200
+        elif result.error is not None and result.error.code == "PARTIAL_WRITE":
+            # Multi-status: some writes committed, resending them would duplicate rows
+            status_code = 207
+        else:
+            status_code = 400
 
         print(f"\n{'='*60}")
         print(f"{'✓' if success else '✗'} Operation: {operation}")
@@ -428,23 +416,23 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'X-Auth-Key-ID': auth_ctx.key_id,
                 'X-Execution-Time-Ms': str(round(execution_time_ms, 2))
             },
-            'body': dumps_json(response_body, default=str)
+            'body': body
         }
 
     except TimeoutError as e:
-        execution_time_ms = (time.time() - start_time) * 1000
+        execution_time_ms = (time.perf_counter() - start_time) * 1000
         print(f"\n✗ Request timed out after {execution_time_ms:.2f}ms")
         return error_response(504, f'Request timeout: {str(e)}', request_id)
 
     except ValueError as e:
         # Validation errors from Pydantic
-        execution_time_ms = (time.time() - start_time) * 1000
+        execution_time_ms = (time.perf_counter() - start_time) * 1000
         print(f"\n✗ Validation error after {execution_time_ms:.2f}ms: {e}")
         return error_response(400, f'Validation error: {str(e)}', request_id)
 
     except RuntimeError as e:
         # Initialization errors
-        execution_time_ms = (time.time() - start_time) * 1000
+        execution_time_ms = (time.perf_counter() - start_time) * 1000
         error_msg = str(e)
         print(f"\n✗ Runtime error after {execution_time_ms:.2f}ms: {error_msg}")
         traceback.print_exc()
@@ -457,7 +445,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
     except Exception as e:
         # Generic errors
-        execution_time_ms = (time.time() - start_time) * 1000
+        execution_time_ms = (time.perf_counter() - start_time) * 1000
         error_msg = str(e)
         print(f"\n✗ Unexpected error after {execution_time_ms:.2f}ms: {error_msg}")
         traceback.print_exc()
@@ -486,7 +474,7 @@ def error_response(status_code: int, message: str, request_id: str = None) -> Di
         'success': False,
         'error': message,
         'request_id': request_id or 'unknown',
-        'timestamp': datetime.utcnow().isoformat() + 'Z'
+        'timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
     }
     
     return {
@@ -9,10 +9,15 @@ Key improvements:
 5. IDE autocomplete support
 """
 
-from typing import Any, Dict, List, Literal, Optional, Union, TypeVar, Generic
+from typing import Annotated, Any, Dict, Final, List, Literal, Optional, Tuple, Union, TypeVar, Generic, get_args
+from dataclasses import dataclass
+from typing_extensions import TypedDict
+import functools
+import sys
+import time
 from datetime import datetime
 from decimal import Decimal
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, PrivateAttr, StringConstraints, TypeAdapter, field_validator, model_validator
 from enum import Enum
 
 # Type variable for generic responses
@@ -26,6 +31,7 @@ class OperationType(str, Enum):
     """Database operation types"""
     QUERY = "QUERY"
     WRITE = "WRITE"
+    WRITE_BATCH = "WRITE_BATCH"
     UPDATE = "UPDATE"
     DELETE = "DELETE"
     HARD_DELETE = "HARD_DELETE"
@@ -40,6 +46,7 @@ class OperationType(str, Enum):
     DROP_NAMESPACE = "DROP_NAMESPACE"
     GET_UPLOAD_URL = "GET_UPLOAD_URL"
     GET_DOWNLOAD_URL = "GET_DOWNLOAD_URL"
+    GET_UPLOAD_URLS_BATCH = "GET_UPLOAD_URLS_BATCH"
     EXPORT_CSV = "EXPORT_CSV"
     EXECUTE_SQL = "EXECUTE_SQL"
     FEDERATED_QUERY = "FEDERATED_QUERY"
@@ -81,6 +88,26 @@ class AggregateOp(str, Enum):
     MEDIAN = "median"
     PERCENTILE = "percentile"
 
+# ============================================================================
+# Identifier Types
+# ============================================================================
+
+# Column reference that is safe to splice into SQL: letters, digits, underscores
+# and dots (for nested struct fields / table-qualified names). The pattern is
+# checked by pydantic-core at parse time, so the SQL builders can interpolate
+# these names without re-validating them.
+Identifier = Annotated[
+    str,
+    StringConstraints(pattern=r'^[A-Za-z_][A-Za-z0-9_.]{0,63}$', max_length=64)
+]
+
+FilterOp = Literal['eq', 'ne', 'gt', 'gte', 'lt', 'lte', 'in', 'like']
+
+# Tenant / namespace / table names repeat across invocations in a warm
+# container; interning makes every parse return the same str object, so the
+# dict lookups keyed on them (caches, identifiers) compare by identity.
+InternedStr = Annotated[str, AfterValidator(sys.intern)]
+
 # ============================================================================
 # Filter Models - Simple Array Format (All filters ANDed)
 # ============================================================================
@@ -88,17 +115,43 @@ class AggregateOp(str, Enum):
 class Filter(BaseModel):
     """Single filter condition - all filters are ANDed together"""
     
-    field: str = Field(..., description="Field name to filter on")
-    operator: str = Field(..., description="Filter operator: eq, ne, gt, gte, lt, lte, in, like")
+    field: Identifier = Field(..., description="Field name to filter on")
+    operator: FilterOp = Field(..., description="Filter operator: eq, ne, gt, gte, lt, lte, in, like")
     value: Any = Field(..., description="Value to compare against")
-    
-    @model_validator(mode='after')
-    def validate_operator(self):
-        """Validate operator is supported"""
-        valid_operators = {'eq', 'ne', 'gt', 'gte', 'lt', 'lte', 'in', 'like'}
-        if self.operator not in valid_operators:
-            raise ValueError(f"Invalid operator '{self.operator}'. Must be one of: {valid_operators}")
-        return self
+
+# ============================================================================
+# Range Models
+# ============================================================================
+
+def _pair_to_fields(value: Any, first: str, second: str) -> Any:
+    """Accept the legacy positional [a, b] form for two-field range models"""
+    if isinstance(value, (tuple, list)) and len(value) == 2:
+        return {first: value[0], second: value[1]}
+    return value
+
+class SubstringSpec(BaseModel):
+    """Substring extraction range"""
+
+    start: int = Field(..., description="1-based start position")
+    length: int = Field(..., description="Number of characters to extract")
+
+    @model_validator(mode='before')
+    @classmethod
+    def accept_pair(cls, value: Any) -> Any:
+        """Allow (start, length) tuples for backwards compatibility"""
+        return _pair_to_fields(value, 'start', 'length')
+
+class TimeWindow(BaseModel):
+    """Time range for change queries"""
+
+    start: datetime = Field(..., description="Window start timestamp")
+    end: datetime = Field(..., description="Window end timestamp")
+
+    @model_validator(mode='before')
+    @classmethod
+    def accept_pair(cls, value: Any) -> Any:
+        """Allow (start, end) tuples for backwards compatibility"""
+        return _pair_to_fields(value, 'start', 'end')
 
 # ============================================================================
 # Projection Models
@@ -115,7 +168,7 @@ class ProjectionField(BaseModel):
     upper: Optional[bool] = Field(None, description="Convert to uppercase")
     lower: Optional[bool] = Field(None, description="Convert to lowercase")
     trim: Optional[bool] = Field(None, description="Trim whitespace")
-    substring: Optional[tuple[int, int]] = Field(None, description="Extract substring (start, length)")
+    substring: Optional[SubstringSpec] = Field(None, description="Extract substring (start, length)")
 
     # Date transformations
     date_format: Optional[str] = Field(None, description="Format date (e.g., 'YYYY-MM-DD')")
@@ -160,8 +213,8 @@ class AggregateField(BaseModel):
 class JoinCondition(BaseModel):
     """Join condition between tables"""
 
-    left_field: str = Field(..., description="Field from left table")
-    right_field: str = Field(..., description="Field from right table")
+    left_field: Identifier = Field(..., description="Field from left table")
+    right_field: Identifier = Field(..., description="Field from right table")
     operator: Optional[str] = Field("eq", description="Join operator (default: eq)")
 
 class JoinClause(BaseModel):
@@ -179,7 +232,7 @@ class JoinClause(BaseModel):
 class SortField(BaseModel):
     """Sort field definition"""
 
-    field: str = Field(..., description="Field to sort by")
+    field: Identifier = Field(..., description="Field to sort by")
     order: SortOrder = Field(SortOrder.ASC, description="Sort order")
     nulls_first: Optional[bool] = Field(None, description="NULL values first")
 
@@ -226,7 +279,7 @@ class QueryRequest(BaseModel):
 
     # Time travel
     as_of: Optional[datetime] = Field(None, description="Query data as of timestamp")
-    between_times: Optional[tuple[datetime, datetime]] = Field(
+    between_times: Optional[TimeWindow] = Field(
         None,
         description="Query changes between timestamps"
     )
@@ -297,17 +350,29 @@ class AggregateRequest(BaseModel):
 # ============================================================================
 # Response Models
 # ============================================================================
-
-class QueryMetadata(BaseModel):
+#
+# Output-only DTOs (QueryMetadata, ResponseMetadata, CompactionStats,
+# TableDescription) are plain slotted dataclasses: the server builds them from
+# trusted values, so there is nothing to validate. Pydantic accepts the
+# instances as-is when they are nested in a response model and serializes
+# them in model_dump()/model_dump_json().
+#
+# Operation-specific *ResponseData models that stay on pydantic share
+# RESPONSE_DATA_CONFIG: immutable once built, and unknown keys are rejected.
+
+RESPONSE_DATA_CONFIG: Final[ConfigDict] = ConfigDict(frozen=True, extra='forbid')
+
+@dataclass(slots=True, frozen=True)
+class QueryMetadata:
     """Query execution metadata"""
 
-    row_count: int = Field(..., description="Number of rows returned")
-    execution_time_ms: float = Field(..., description="Query execution time")
-    scanned_bytes: Optional[int] = Field(None, description="Bytes scanned")
-    scanned_rows: Optional[int] = Field(None, description="Rows scanned")
-    cache_hit: bool = Field(False, description="Result from cache")
-    query_id: Optional[str] = Field(None, description="Unique query identifier")
-    warnings: Optional[List[str]] = Field(None, description="Query warnings")
+    row_count: int                          # Number of rows returned
+    execution_time_ms: float                # Query execution time
+    scanned_bytes: Optional[int] = None     # Bytes scanned
+    scanned_rows: Optional[int] = None      # Rows scanned
+    cache_hit: bool = False                 # Result from cache
+    query_id: Optional[str] = None          # Unique query identifier
+    warnings: Optional[List[str]] = None    # Query warnings
 
 class ErrorDetail(BaseModel):
     """Detailed error information"""
@@ -322,11 +387,12 @@ class ErrorDetail(BaseModel):
 # Base Response Models - Standard for All Operations
 # ============================================================================
 
-class ResponseMetadata(BaseModel):
+@dataclass(slots=True, frozen=True)
+class ResponseMetadata:
     """Standard metadata included in all responses"""
-    
-    request_id: str = Field(..., description="Unique request identifier")
-    execution_time_ms: float = Field(..., description="Total execution time in milliseconds")
+
+    request_id: str             # Unique request identifier
+    execution_time_ms: float    # Total execution time in milliseconds
 
 class BaseResponse(BaseModel):
     """Base response model - all operation responses inherit from this
@@ -349,6 +415,25 @@ class BaseResponse(BaseModel):
             raise ValueError("Failed response must include error details")
         return self
 
+    @classmethod
+    def ok(cls, metadata: Optional[ResponseMetadata] = None, **data: Any):
+        """Build a success response from trusted values, skipping validation
+
+        Operations construct these from values they produced themselves, so the
+        validator pipeline is pure overhead; keyword arguments populate `data`.
+        Only use this for responses - requests must always be validated.
+        """
+        data_model = next(
+            arg for arg in get_args(cls.model_fields['data'].annotation)
+            if arg is not type(None)
+        )
+        return cls.model_construct(
+            success=True,
+            data=data_model.model_construct(**data),
+            metadata=metadata or ResponseMetadata(request_id="temp", execution_time_ms=0),
+            error=None,
+        )
+
 class QueryResponseData(BaseModel):
     """Data structure for query responses"""
     
@@ -439,6 +524,8 @@ class PartitionConfig(BaseModel):
 
 class TableProperties(BaseModel):
     """Table properties and configuration"""
+    model_config = ConfigDict(frozen=True)
+
     compression: Optional[str] = "snappy"
     file_format: Optional[str] = "parquet"
     description: Optional[str] = None
@@ -477,6 +564,37 @@ class WriteResponse(BaseResponse):
     
     data: Optional[WriteResponseData] = Field(None, description="Write operation results")
 
+class WriteBatchItem(BaseModel):
+    """Records for one table in a batched write"""
+    table: str
+    records: List[Dict[str, Any]]
+
+class WriteBatchRequest(BaseModel):
+    """Several writes for one tenant, committed once per table"""
+    operation: Literal[OperationType.WRITE_BATCH] = OperationType.WRITE_BATCH
+    tenant_id: InternedStr
+    namespace: InternedStr = "default"
+    writes: List[WriteBatchItem] = Field(..., min_length=1, description="Writes to apply (same-table writes share a commit)")
+
+class WriteBatchItemResult(BaseModel):
+    """Outcome of one write in a batch"""
+    model_config = RESPONSE_DATA_CONFIG
+
+    table: str
+    success: bool = Field(..., description="Whether this write was committed")
+    data: Optional[WriteResponseData] = Field(None, description="Write results (if committed)")
+    error: Optional[ErrorDetail] = Field(None, description="Error details (if not committed)")
+
+class WriteBatchResponseData(BaseModel):
+    """Data for batched write response (same order as the request writes)"""
+    model_config = RESPONSE_DATA_CONFIG
+
+    items: List[WriteBatchItemResult] = Field(..., description="Write results per request item")
+
+class WriteBatchResponse(BaseResponse):
+    """Batched write operation response"""
+    data: Optional[WriteBatchResponseData] = Field(None, description="Batched write results")
+
 # ============================================================================
 # Update Operations
 # ============================================================================
@@ -582,12 +700,32 @@ class UpsertResponse(BaseResponse):
 # Compact Operations
 # ============================================================================
 
+@dataclass(slots=True, frozen=True)
+class CompactionPolicy:
+    """Resolved compaction thresholds (request overrides applied over config)"""
+    small_file_threshold_bytes: int     # Files below this size are compaction candidates
+    max_files: int                      # Maximum files to compact in one run
+    min_files: int                      # Minimum small files before compaction triggers
+    force: bool                         # Compact even if min_files is not reached
+
+@functools.lru_cache(maxsize=1024)
+def _compaction_policy(
+    target_file_size_mb: int, max_files: int, min_files: int, force: bool
+) -> CompactionPolicy:
+    """Shared CompactionPolicy instance per distinct set of thresholds"""
+    return CompactionPolicy(
+        small_file_threshold_bytes=target_file_size_mb * 1024 * 1024,
+        max_files=max_files,
+        min_files=min_files,
+        force=force,
+    )
+
 class CompactRequest(BaseModel):
     """File compaction request to merge small files"""
     operation: Literal[OperationType.COMPACT] = OperationType.COMPACT
-    tenant_id: str
-    namespace: str = "default"
-    table: str
+    tenant_id: InternedStr
+    namespace: InternedStr = "default"
+    table: InternedStr
 
     # Compaction options
     force: bool = Field(
@@ -604,10 +742,11 @@ class CompactRequest(BaseModel):
     )
 
     # Partition-specific compaction
-    partition_filters: Optional[List[Filter]] = Field(
+    partition_filters: Optional[Tuple[Filter, ...]] = Field(
         None,
         description="Only compact files matching partition filters (all ANDed)"
     )
+    _compiled_partition_filter: Any = PrivateAttr(default=None)
 
     # Snapshot management
     expire_snapshots: bool = Field(
@@ -616,24 +755,48 @@ class CompactRequest(BaseModel):
     )
     snapshot_retention_hours: int = Field(
         default=168,  # 7 days
+        ge=1,
+        le=8760,  # 1 year
         description="Hours to retain old snapshots"
     )
 
-class CompactionStats(BaseModel):
+    @property
+    def retention_cutoff_ms(self) -> int:
+        """Snapshot expiry cutoff as epoch milliseconds (now - retention)"""
+        return int((time.time() - self.snapshot_retention_hours * 3600) * 1000)
+
+    def to_policy(self, compaction_config: Dict[str, Any]) -> CompactionPolicy:
+        """Resolve thresholds against the iceberg.compaction config section"""
+        return _compaction_policy(
+            self.target_file_size_mb or compaction_config.get('small_file_threshold_mb', 64),
+            self.max_files or compaction_config.get('max_files_per_compaction', 100),
+            compaction_config.get('min_files_to_compact', 10),
+            self.force,
+        )
+
+    def compiled_partition_filter(self, compiler) -> Any:
+        """Compile partition_filters with `compiler` once and reuse the result"""
+        if self._compiled_partition_filter is None and self.partition_filters:
+            self._compiled_partition_filter = compiler(self.partition_filters)
+        return self._compiled_partition_filter
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class CompactionStats:
     """Statistics about compaction operation"""
-    files_before: int = Field(..., description="Number of files before compaction")
-    files_after: int = Field(..., description="Number of files after compaction")
-    files_compacted: int = Field(..., description="Number of files merged")
-    files_removed: int = Field(..., description="Number of old files removed")
-    bytes_before: int = Field(..., description="Total bytes before compaction")
-    bytes_after: int = Field(..., description="Total bytes after compaction")
-    bytes_saved: int = Field(..., description="Bytes saved by compression")
-    snapshots_expired: int = Field(default=0, description="Old snapshots removed")
-    compaction_time_ms: float = Field(..., description="Time taken for compaction")
-    small_files_remaining: int = Field(..., description="Small files still remaining")
+    files_before: int               # Number of files before compaction
+    files_after: int                # Number of files after compaction
+    files_compacted: int            # Number of files merged
+    files_removed: int              # Number of old files removed
+    bytes_before: int               # Total bytes before compaction
+    bytes_after: int                # Total bytes after compaction
+    bytes_saved: int                # Bytes saved by compression
+    snapshots_expired: int = 0      # Old snapshots removed
+    compaction_time_ms: int         # Time taken for compaction (whole ms)
+    small_files_remaining: int      # Small files still remaining
 
 class CompactResponseData(BaseModel):
     """Data structure for compaction operation results"""
+    model_config = RESPONSE_DATA_CONFIG
     
     compacted: bool = Field(..., description="Whether compaction was performed")
     reason: Optional[str] = Field(None, description="Reason if compaction skipped")
@@ -651,9 +814,9 @@ class CompactResponse(BaseResponse):
 class CreateTableRequest(BaseModel):
     """Create table request"""
     operation: Literal[OperationType.CREATE_TABLE] = OperationType.CREATE_TABLE
-    tenant_id: str
-    namespace: str = "default"
-    table: str
+    tenant_id: InternedStr
+    namespace: InternedStr = "default"
+    table: InternedStr
     table_schema: SchemaDefinition = Field(..., alias="schema")
     partition: Optional[PartitionConfig] = None
     properties: Optional[TableProperties] = None
@@ -661,6 +824,7 @@ class CreateTableRequest(BaseModel):
 
 class CreateTableResponseData(BaseModel):
     """Data structure for create table operation results"""
+    model_config = RESPONSE_DATA_CONFIG
     
     table_created: bool = Field(..., description="Whether table was created")
     table_existed: bool = Field(False, description="Whether table already existed")
@@ -677,26 +841,32 @@ class CreateTableResponse(BaseResponse):
 class DescribeTableRequest(BaseModel):
     """Describe table request"""
     operation: Literal[OperationType.DESCRIBE_TABLE] = OperationType.DESCRIBE_TABLE
-    tenant_id: str
-    namespace: str = "default"
-    table: str
+    tenant_id: InternedStr
+    namespace: InternedStr = "default"
+    table: InternedStr
 
 class ListTablesRequest(BaseModel):
     """List tables request"""
     operation: Literal[OperationType.LIST_TABLES] = OperationType.LIST_TABLES
-    tenant_id: str
-    namespace: str = "default"
+    tenant_id: InternedStr
+    namespace: InternedStr = "default"
+
+class TableSchemaInfo(TypedDict, total=False):
+    """Shape of TableDescription.table_schema"""
+    fields: Dict[str, str]          # Column name -> Iceberg type string
 
-class TableDescription(BaseModel):
+@dataclass(slots=True, frozen=True)
+class TableDescription:
     """Table description"""
     table_name: str
     namespace: str
-    table_schema: Optional[Dict[str, Any]] = Field(None, alias="schema")
+    table_schema: Optional[TableSchemaInfo] = None
     row_count: Optional[int] = None
     size_bytes: Optional[int] = None
 
 class ListTablesResponseData(BaseModel):
     """Data structure for list tables operation results"""
+    model_config = RESPONSE_DATA_CONFIG
     
     tables: List[str] = Field(default_factory=list, description="List of table names")
 
@@ -707,6 +877,7 @@ class ListTablesResponse(BaseResponse):
 
 class DescribeTableResponseData(BaseModel):
     """Data structure for describe table operation results"""
+    model_config = RESPONSE_DATA_CONFIG
     
     table: TableDescription = Field(..., description="Table description and metadata")
 
@@ -722,13 +893,14 @@ class DescribeTableResponse(BaseResponse):
 class DropTableRequest(BaseModel):
     """Drop table request"""
     operation: Literal[OperationType.DROP_TABLE] = OperationType.DROP_TABLE
-    tenant_id: str
-    namespace: str = "default"
-    table: str
+    tenant_id: InternedStr
+    namespace: InternedStr = "default"
+    table: InternedStr
     purge: bool = Field(False, description="Purge data and metadata (not supported by all catalogs)")
 
 class DropTableResponseData(BaseModel):
     """Data structure for drop table operation results"""
+    model_config = RESPONSE_DATA_CONFIG
     
     table_dropped: bool = Field(..., description="Whether table was dropped")
     table_existed: bool = Field(True, description="Whether table existed")
@@ -745,11 +917,12 @@ class DropTableResponse(BaseResponse):
 class DropNamespaceRequest(BaseModel):
     """Drop namespace (database) request"""
     operation: Literal[OperationType.DROP_NAMESPACE] = OperationType.DROP_NAMESPACE
-    tenant_id: str
-    namespace: str
+    tenant_id: InternedStr
+    namespace: InternedStr
 
 class DropNamespaceResponseData(BaseModel):
     """Data structure for drop namespace operation results"""
+    model_config = RESPONSE_DATA_CONFIG
     
     namespace_dropped: bool = Field(..., description="Whether namespace was dropped")
     namespace_existed: bool = Field(True, description="Whether namespace existed")
@@ -766,7 +939,7 @@ class DropNamespaceResponse(BaseResponse):
 class GetUploadUrlRequest(BaseModel):
     """Request for a presigned S3 upload URL"""
     operation: Literal[OperationType.GET_UPLOAD_URL] = OperationType.GET_UPLOAD_URL
-    tenant_id: str
+    tenant_id: InternedStr
     filename: str = Field(..., description="Name of the file to upload")
     content_type: str = Field(..., description="MIME type of the file")
     folder: Optional[str] = Field(None, description="Optional subfolder for the file (e.g. 'pids', 'gateways')")
@@ -774,6 +947,7 @@ class GetUploadUrlRequest(BaseModel):
 
 class GetUploadUrlResponseData(BaseModel):
     """Data for upload URL response"""
+    model_config = RESPONSE_DATA_CONFIG
     upload_url: str = Field(..., description="Presigned PUT URL")
     file_key: str = Field(..., description="S3 object key to store in DB")
     expires_in: int = Field(..., description="Seconds until expiration")
@@ -782,16 +956,40 @@ class GetUploadUrlResponse(BaseResponse):
     """Response containing upload URL"""
     data: Optional[GetUploadUrlResponseData] = Field(None, description="Upload URL details")
 
+class GetUploadUrlItem(BaseModel):
+    """Single file in a batched upload URL request"""
+    filename: str = Field(..., description="Name of the file to upload")
+    content_type: str = Field(..., description="MIME type of the file")
+    folder: Optional[str] = Field(None, description="Optional subfolder for the file (e.g. 'pids', 'gateways')")
+    expires_in: int = Field(300, description="URL expiration in seconds")
+
+class GetUploadUrlsBatchRequest(BaseModel):
+    """Request presigned S3 upload URLs for several files in one call"""
+    operation: Literal[OperationType.GET_UPLOAD_URLS_BATCH] = OperationType.GET_UPLOAD_URLS_BATCH
+    tenant_id: InternedStr
+    files: List[GetUploadUrlItem] = Field(..., min_length=1, max_length=100, description="Files to sign (max 100)")
+
+class GetUploadUrlsBatchResponseData(BaseModel):
+    """Data for batched upload URL response (same order as the request files)"""
+    model_config = RESPONSE_DATA_CONFIG
+
+    items: List[GetUploadUrlResponseData] = Field(..., description="Upload URL details per file")
+
+class GetUploadUrlsBatchResponse(BaseResponse):
+    """Response containing upload URLs for every requested file"""
+    data: Optional[GetUploadUrlsBatchResponseData] = Field(None, description="Upload URL details")
+
 class GetDownloadUrlRequest(BaseModel):
     """Request for a presigned S3 download URL"""
     operation: Literal[OperationType.GET_DOWNLOAD_URL] = OperationType.GET_DOWNLOAD_URL
-    tenant_id: str
+    tenant_id: InternedStr
     file_key: str = Field(..., description="S3 object key")
     expires_in: int = Field(3600, description="URL expiration in seconds")
     bucket: Optional[str] = Field(None, description="Override S3 bucket (for legacy keys in different buckets)")
 
 class GetDownloadUrlResponseData(BaseModel):
     """Data for download URL response"""
+    model_config = RESPONSE_DATA_CONFIG
     download_url: str = Field(..., description="Presigned GET URL")
     expires_in: int = Field(..., description="Seconds until expiration")
 
@@ -806,11 +1004,11 @@ class GetDownloadUrlResponse(BaseResponse):
 class ExportCsvRequest(BaseModel):
     """Request to export table data as CSV"""
     operation: Literal[OperationType.EXPORT_CSV] = OperationType.EXPORT_CSV
-    tenant_id: str
-    namespace: str = "default"
-    table: str
+    tenant_id: InternedStr
+    namespace: InternedStr = "default"
+    table: InternedStr
     # Filtering and Selection
-    filters: Optional[List[Filter]] = Field(None, description="Filter conditions (all ANDed)")
+    filters: Optional[Tuple[Filter, ...]] = Field(None, description="Filter conditions (all ANDed)")
     projection: Optional[List[str]] = Field(None, description="Columns to export (default: all)")
     sort: Optional[List[SortField]] = Field(None, description="Sort order")
     limit: Optional[int] = Field(None, description="Maximum rows to export")
@@ -822,6 +1020,7 @@ class ExportCsvRequest(BaseModel):
 
 class ExportCsvResponseData(BaseModel):
     """Data for CSV export response"""
+    model_config = RESPONSE_DATA_CONFIG
     download_url: str = Field(..., description="Presigned URL to download the CSV")
     rows_exported: int = Field(..., description="Number of rows exported")
     file_size_bytes: Optional[int] = Field(None, description="Size of exported file in bytes")
@@ -921,6 +1120,49 @@ class VectorIndexResponse(BaseResponse):
     data: Optional[VectorIndexResponseData] = None
 
 
-# Update forward references for new models
-FieldDefinition.model_rebuild()
-SchemaDefinition.model_rebuild()
\ No newline at end of file
+# Update forward references for new models (skipped when already resolved -
+# rebuilding a complete model only adds import time)
+for _model in (FieldDefinition, SchemaDefinition):
+    if not _model.__pydantic_complete__:
+        _model.model_rebuild()
+
+
+# ============================================================================
+# Operation Dispatch
+# ============================================================================
+
+# Request model per operation, built once at import so the handler resolves
+# the model with a single dict lookup instead of walking an if/elif chain.
+# AGGREGATE and INSERT have no standalone request model and are not routable.
+OPERATION_REQUEST_MODELS: Final[Dict[OperationType, type[BaseModel]]] = {
+    OperationType.QUERY: QueryRequest,
+    OperationType.WRITE: WriteRequest,
+    OperationType.WRITE_BATCH: WriteBatchRequest,
+    OperationType.UPDATE: UpdateRequest,
+    OperationType.DELETE: DeleteRequest,
+    OperationType.HARD_DELETE: HardDeleteRequest,
+    OperationType.UPSERT: UpsertRequest,
+    OperationType.COMPACT: CompactRequest,
+    OperationType.CREATE_TABLE: CreateTableRequest,
+    OperationType.LIST_TABLES: ListTablesRequest,
+    OperationType.DESCRIBE_TABLE: DescribeTableRequest,
+    OperationType.DROP_TABLE: DropTableRequest,
+    OperationType.DROP_NAMESPACE: DropNamespaceRequest,
+    OperationType.EXPORT_CSV: ExportCsvRequest,
+    OperationType.GET_UPLOAD_URL: GetUploadUrlRequest,
+    OperationType.GET_DOWNLOAD_URL: GetDownloadUrlRequest,
+    OperationType.GET_UPLOAD_URLS_BATCH: GetUploadUrlsBatchRequest,
+    OperationType.EXECUTE_SQL: ExecuteSqlRequest,
+    OperationType.FEDERATED_QUERY: FederatedQueryRequest,
+    OperationType.VECTOR_SEARCH: VectorSearchRequest,
+    OperationType.VECTOR_WRITE: VectorWriteRequest,
+    OperationType.VECTOR_INDEX: VectorIndexRequest,
+}
+
+# Tagged union over every routable request: pydantic-core picks the variant
+# from the `operation` literal instead of trying each model in turn.
+RequestUnion = Annotated[
+    Union[tuple(OPERATION_REQUEST_MODELS.values())],
+    Field(discriminator="operation"),
+]
+REQUEST_ADAPTER: Final[TypeAdapter] = TypeAdapter(RequestUnion, config=ConfigDict(title="Request"))
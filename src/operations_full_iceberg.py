@@ -3,21 +3,29 @@ Full Iceberg implementation using PyIceberg for writes and DuckDB for reads.
 
 This provides complete ACID transactions with Apache Iceberg:
 - PyIceberg: Create tables, write data, manage catalog
-- Polars: Data manipulation and Parquet conversion (2-10x faster than Pandas)
+- PyArrow: Build write batches directly in the Iceberg schema
 - DuckDB: Query Iceberg tables using iceberg_scan
 """
 
+import atexit
+import functools
+import inspect
 import json
+from collections import OrderedDict
 import hashlib
+import itertools
 import time
 import os
+import queue
+import threading
 import uuid
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Union
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, replace
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, Optional, List, Sequence, Tuple, Union
 
 # Fast imports - always needed
 import duckdb
-import polars as pl
 
 # Fast JSON serialization (3x faster than standard json)
 import orjson
@@ -59,6 +67,24 @@ def _get_pyiceberg_types():
         }
     return _lazy_imports['pyiceberg_types']
 
+def _get_primitive_type_mapping():
+    """Schema type name -> Iceberg primitive type instance, built once on first use"""
+    if 'primitive_type_mapping' not in _lazy_imports:
+        types = _get_pyiceberg_types()
+        _lazy_imports['primitive_type_mapping'] = {
+            'string': types['StringType'](),
+            'integer': types['IntegerType'](),
+            'long': types['LongType'](),
+            'float': types['FloatType'](),
+            'double': types['DoubleType'](),
+            'boolean': types['BooleanType'](),
+            'date': types['DateType'](),
+            'timestamp': types['TimestampType'](),
+            'decimal': types['DecimalType'](38, 9),  # Default precision and scale
+            'binary': types['BinaryType'](),
+        }
+    return _lazy_imports['primitive_type_mapping']
+
 def _get_pyiceberg_catalog():
     """Lazy load PyIceberg catalog - only when needed"""
     if 'pyiceberg_catalog' not in _lazy_imports:
@@ -76,7 +102,8 @@ def _get_pyiceberg_catalog():
 
 from .config import get_config
 from .models import (
-    WriteRequest, WriteResponse,
+    WriteRequest, WriteResponse, WriteResponseData,
+    WriteBatchRequest, WriteBatchResponse, WriteBatchResponseData, WriteBatchItemResult,
     UpdateRequest, UpdateResponse,
     DeleteRequest, DeleteResponse,
     HardDeleteRequest, HardDeleteResponse,
@@ -85,14 +112,122 @@ from .models import (
     CreateTableRequest, CreateTableResponse,
     DescribeTableRequest, DescribeTableResponse, ListTablesRequest,
     TableDescription, ListTablesResponse,
-    QueryRequest, QueryResponse,
+    QueryRequest, QueryResponse, QueryResponseData,
+    ProjectionField, AggregateField, ResponseMetadata,
     ErrorDetail, QueryMetadata,
-    DropTableRequest, DropTableResponse, DropTableResponseData,
-    DropNamespaceRequest, DropNamespaceResponse, DropNamespaceResponseData,
-    ExportCsvRequest, ExportCsvResponse, ExportCsvResponseData
+    DropTableRequest, DropTableResponse,
+    DropNamespaceRequest, DropNamespaceResponse,
+    ExportCsvRequest, ExportCsvResponse
 )
 from .query_builder import TypeSafeQueryBuilder
 
+# Content-addressed record IDs: md5 over canonical (sorted-key) JSON.
+# One shared encoder avoids json.dumps building a JSONEncoder per record;
+# its output is byte-identical, so IDs stay stable for existing data.
+_canonical_json = json.JSONEncoder(sort_keys=True).encode
+
+# Rows per Arrow batch when streaming a table rewrite out of DuckDB
+COMPACTION_BATCH_ROWS = 131072
+
+# On-disk bytes of small files merged per output chunk, and chunks rewritten at
+# once - together they bound compaction memory (decoded Arrow is several x larger)
+COMPACTION_CHUNK_BYTES = 128 * 1024 * 1024
+COMPACTION_WORKERS = 4
+
+# Row order written by compaction: tenant first, then record versions together
+COMPACTION_SORT_COLUMNS = ("_tenant_id", "_record_id", "_version")
+
+# Columns that hold the same value on every version of a record
+VERSION_INVARIANT_COLUMNS = frozenset({"_tenant_id", "_record_id"})
+
+# Parallel manifest reads in PyIceberg scans (respects an explicit setting). Set
+# at import, before PyIceberg creates its shared executor from this value
+os.environ.setdefault("PYICEBERG_MAX_WORKERS", str((os.cpu_count() or 1) * 4))
+
+# Partition filter operators whose DuckDB SQL and PyIceberg expression select
+# exactly the same rows (NULLs never match), so a rewrite can be scoped by them
+PARTITION_REWRITE_OPERATORS = frozenset({"eq", "gt", "gte", "lt", "lte", "in"})
+
+
+def _content_record_ids(records: List[Dict[str, Any]]) -> List[str]:
+    """Stable _record_id for each record's user fields"""
+    # Bound locals and one comprehension: no per-record function call or global lookups
+    md5, encode = hashlib.md5, _canonical_json
+    return [md5(encode(record).encode(), usedforsecurity=False).hexdigest() for record in records]
+
+
+def _arrow_table(result) -> "pa.Table":
+    """Fetch a DuckDB result as an Arrow table (newer DuckDB deprecates fetch_arrow_table)"""
+    fetch = getattr(result, "to_arrow_table", None) or result.fetch_arrow_table
+    return fetch()
+
+
+def _arrow_reader(result, batch_rows: int) -> "pa.RecordBatchReader":
+    """Stream a DuckDB result as Arrow record batches (newer DuckDB deprecates fetch_record_batch)"""
+    if hasattr(result, "to_arrow_reader"):
+        return result.to_arrow_reader(batch_rows)
+    return result.fetch_record_batch(batch_rows)
+
+
+def _coerce_array(values: list, arrow_type) -> "pa.Array":
+    """
+    Build an Arrow array of arrow_type from Python values
+
+    Typed conversion first; values that need coercion (e.g. ISO strings for a
+    timestamp column) are inferred and cast. Zone-suffixed timestamp strings
+    are parsed as UTC instants and stored naive, as Iceberg's TimestampType is.
+    """
+    pa = _get_pyarrow()
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        pass
+
+    inferred = pa.array(values)
+    if pa.types.is_timestamp(arrow_type) and arrow_type.tz is None and pa.types.is_string(inferred.type):
+        try:
+            return inferred.cast(arrow_type)
+        except pa.ArrowInvalid:
+            return inferred.cast(pa.timestamp(arrow_type.unit, tz="UTC")).cast(arrow_type)
+    return inferred.cast(arrow_type)
+
+
+@functools.lru_cache(maxsize=None)
+def _file_rewrite_supported() -> bool:
+    """
+    Whether this PyIceberg has the file-level write helpers compaction relies on
+
+    ArrowScan and _dataframe_to_data_files are private API, so their presence
+    and the parameters we pass are checked once, up front.
+    """
+    try:
+        from pyiceberg.io.pyarrow import ArrowScan, _dataframe_to_data_files
+        scan_params = inspect.signature(ArrowScan).parameters
+        write_params = inspect.signature(_dataframe_to_data_files).parameters
+    except (ImportError, TypeError, ValueError):
+        return False
+    return (
+        {"table_metadata", "io", "projected_schema", "row_filter"} <= scan_params.keys()
+        and hasattr(ArrowScan, "to_table")
+        and {"table_metadata", "df", "io", "write_uuid", "counter"} <= write_params.keys()
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _overwrite_accepts_reader() -> bool:
+    """Whether Table.overwrite() takes a RecordBatchReader (newer PyIceberg) or only a Table"""
+    from pyiceberg.table import Table
+    try:
+        df = inspect.signature(Table.overwrite).parameters["df"]
+    except (KeyError, TypeError, ValueError):
+        return False
+    return "RecordBatchReader" in str(df.annotation)
+
+
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, matching Iceberg's TimestampType"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 class FullIcebergOperations:
     """Full Iceberg operations using PyIceberg for writes and DuckDB for reads"""
@@ -101,6 +236,9 @@ class FullIcebergOperations:
     _shared_duckdb_conn = None
     _conn_created_at = 0
 
+    # Stateless filter -> SQL builder shared by every operation
+    _query_builder = TypeSafeQueryBuilder()
+
     def __init__(self):
         """
         Initialize PyIceberg catalog and DuckDB connection
@@ -119,13 +257,32 @@ class FullIcebergOperations:
 
             print("Initializing DuckDB...")
             self.conn = self._init_duckdb()
+
+            # Cursors share the database (extensions, S3 settings, object cache)
+            # but carry their own registered views, so queries don't contend on self.conn
+            pool_size = int(os.environ.get('DUCKDB_CURSOR_POOL_SIZE', '4'))
+            self._cursor_pool = queue.Queue(maxsize=pool_size)
+            for _ in range(pool_size):
+                self._cursor_pool.put(self.conn.cursor())
             
             # Initialize metadata cache for query performance
-            self._metadata_cache = {}
+            # OrderedDict-backed LRUs keep long-lived containers at a bounded size
+            self._metadata_cache = OrderedDict()
+            self._metadata_cache_max_entries = 512
             self._cache_ttl = 60  # 60s cache - balances Glue costs vs write consistency
+            # Entries whose path is re-validated unchanged double their TTL up to this cap
+            self._metadata_cache_max_ttl = int(os.environ.get('METADATA_CACHE_MAX_TTL', '600'))
+
+            # Loaded Iceberg table handles, keyed by table identifier
+            self._table_cache = OrderedDict()
+            # Arrow schema + column order per table, reused while schema_id is unchanged
+            self._arrow_schema_cache = OrderedDict()
+            self._table_cache_max_entries = 256  # bounds both caches above
+            self._table_cache_ttl = 30  # 30s - bounds staleness against writers in other containers
 
             # Initialize query result cache for repeated queries
-            self._query_cache = {}
+            self._query_cache = OrderedDict()
+            self._query_cache_max_entries = 128  # results can be large - keep fewer
             self._query_cache_ttl = 30  # 30s for query results - keeps reads fresh after writes
             print(f"✓ Query cache initialized (TTL: {self._cache_ttl}s, Result cache: {self._query_cache_ttl}s)")
 
@@ -138,6 +295,13 @@ class FullIcebergOperations:
                 'estimated_savings': 0.0
             }
 
+            # Background housekeeping (compaction probes) off the write path
+            self._housekeeping = ThreadPoolExecutor(max_workers=1, thread_name_prefix="housekeeping")
+            # table_identifier -> (compaction_recommended, small_files_count, probed_at);
+            # written by the housekeeping thread, so every access holds the lock
+            self._compaction_hints = {}
+            self._compaction_hints_lock = threading.Lock()
+
             # Compiled query plans cache for 30% faster execution
             self._compiled_queries = {}
             print("✓ Compiled query cache initialized")
@@ -286,23 +450,32 @@ class FullIcebergOperations:
             print("Configuring DuckDB settings...")
             # Auto-detect Lambda memory and optimize accordingly
             lambda_memory_mb = int(os.environ.get('AWS_LAMBDA_FUNCTION_MEMORY_SIZE', '3008'))
+            # SET statements are collected and sent as one multi-statement execute()
             if lambda_memory_mb >= 5120:
                 # 5GB Lambda - use 4.5GB for DuckDB
-                conn.execute("SET memory_limit='4.5GB';")
-                conn.execute("SET threads=3;")  # 3 vCPUs at 5GB
+                settings = [
+                    "SET memory_limit='4.5GB';",
+                    "SET threads=3;",  # 3 vCPUs at 5GB
+                ]
             else:
                 # 3GB Lambda - use 2.5GB for DuckDB
-                conn.execute("SET memory_limit='2.5GB';")
-                conn.execute("SET threads=2;")  # 2 vCPUs at 3GB
+                settings = [
+                    "SET memory_limit='2.5GB';",
+                    "SET threads=2;",  # 2 vCPUs at 3GB
+                ]
 
             # Performance optimizations
-            conn.execute("SET enable_object_cache=true;")
-            conn.execute("SET enable_http_metadata_cache=true;")
-            conn.execute("SET force_compression='zstd';")
-            conn.execute("SET preserve_insertion_order=false;")
-            conn.execute("SET checkpoint_threshold='256MB';")  # Reduce checkpoint frequency
-            conn.execute("SET temp_directory='/tmp';")  # Use local temp directory
-            print("  ✓ Performance optimizations enabled")
+            settings.extend([
+                "SET enable_object_cache=true;",
+                "SET enable_http_metadata_cache=true;",
+                "SET force_compression='zstd';",
+                "SET preserve_insertion_order=false;",
+                # Export VARCHAR/BLOB/LIST as Arrow large types, matching PyIceberg's Arrow
+                # schemas, so casting fetched data to the Iceberg schema copies no buffers
+                "SET arrow_large_buffer_size=true;",
+                "SET checkpoint_threshold='256MB';",  # Reduce checkpoint frequency
+                "SET temp_directory='/tmp';",  # Use local temp directory
+            ])
 
             # Configure S3 - Handle S3 Express One Zone automatically
             print("Configuring S3 settings...")
@@ -342,9 +515,9 @@ class FullIcebergOperations:
                 s3_commands.append(f"SET s3_access_key_id='{s3_config['access_key_id']}';")
                 s3_commands.append(f"SET s3_secret_access_key='{s3_config['secret_access_key']}';")
 
-            # Execute all S3 configuration commands
-            for cmd in s3_commands:
-                conn.execute(cmd)
+            # Execute performance + S3 configuration in a single round-trip
+            conn.execute("\n".join(settings + s3_commands))
+            print("  ✓ Performance optimizations enabled")
 
             print(f"✓ DuckDB initialized with Iceberg extension (threads={duckdb_config['threads']}, memory={duckdb_config['memory_limit']})")
             return conn
@@ -356,12 +529,284 @@ class FullIcebergOperations:
             traceback.print_exc()
             raise RuntimeError(error_msg) from e
 
-    def _get_metadata_path(self, table_identifier: str) -> str:
+    def _load_table_cached(self, table_identifier: str):
+        """
+        Load an Iceberg table, reusing a recently loaded handle
+
+        PyIceberg refreshes a Table in place when it commits, so handles stay
+        current for this instance's own writes; the TTL bounds staleness
+        against writers in other containers. Once the TTL lapses, a handle whose
+        metadata pointer is unchanged in the catalog is revalidated instead of
+        re-reading and re-parsing the metadata JSON.
+
+        Args:
+            table_identifier: Full table identifier
+
+        Returns:
+            PyIceberg Table
+        """
+        cached = self._table_cache.get(table_identifier)
+        if cached:
+            if time.monotonic() - cached[1] < self._table_cache_ttl:
+                self._table_cache.move_to_end(table_identifier)
+                return cached[0]
+            if self._current_metadata_location(table_identifier) == cached[0].metadata_location:
+                self._cache_table(table_identifier, cached[0])
+                return cached[0]
+
+        table = self._get_catalog().load_table(table_identifier)
+        self._cache_table(table_identifier, table)
+        return table
+
+    def _current_metadata_location(self, table_identifier: str) -> Optional[str]:
+        """
+        Current metadata pointer from the catalog, without loading the metadata file
+
+        Only Glue exposes the pointer separately (table parameters); other
+        catalogs return the full metadata, so None means "load the table".
+        """
+        catalog = self._get_catalog()
+        glue = getattr(catalog, "glue", None)
+        if glue is None:
+            return None
+        try:
+            database_name, table_name = catalog.identifier_to_database_and_table(table_identifier)
+            glue_table = glue.get_table(DatabaseName=database_name, Name=table_name)["Table"]
+            return glue_table.get("Parameters", {}).get("metadata_location")
+        except Exception:
+            return None
+
+    def _cache_metadata_path(self, table_identifier: str, metadata_path: str, cached_time: float, ttl: float) -> None:
+        """Store a metadata path, evicting the least recently used entry when full"""
+        self._metadata_cache[table_identifier] = (metadata_path, cached_time, ttl)
+        self._metadata_cache.move_to_end(table_identifier)
+        if len(self._metadata_cache) > self._metadata_cache_max_entries:
+            self._metadata_cache.popitem(last=False)
+
+    def _invalidate_query_cache(self, table_identifier: str) -> None:
+        """Drop cached query results for one table (other tenants' entries are untouched)"""
+        stale_keys = [k for k in self._query_cache if k[0] == table_identifier]
+        for k in stale_keys:
+            del self._query_cache[k]
+
+    def _cache_table(self, table_identifier: str, table) -> None:
+        """Store a (re)loaded or just-committed table handle, evicting the least recently used"""
+        self._table_cache[table_identifier] = (table, time.monotonic())
+        self._table_cache.move_to_end(table_identifier)
+        if len(self._table_cache) > self._table_cache_max_entries:
+            self._table_cache.popitem(last=False)
+
+    def _commit_with_retry(self, table_identifier: str, table, commit: Callable[[Any], None],
+                           retry: bool = True):
+        """
+        Run a commit on a table handle, retrying once on a freshly loaded handle
+
+        Cached handles may lag writers in other containers by up to the TTL, and
+        the catalog rejects a commit built on one with CommitFailedException.
+        The handle is then evicted, reloaded and the commit retried once; any
+        other failure evicts it and re-raises.
+
+        Only commits that stay correct on any snapshot may retry: blind appends,
+        and deletes that re-evaluate their filter. Read-modify-write commits
+        (rows derived from an earlier read) pass retry=False, so a conflict
+        surfaces as an error instead of re-applying rows computed from a
+        snapshot another writer has since replaced.
+
+        Returns:
+            The table handle the commit succeeded on (refreshed in place)
+        """
+        from pyiceberg.exceptions import CommitFailedException
+
+        try:
+            try:
+                commit(table)
+            except CommitFailedException as e:
+                if not retry:
+                    print(f"✗ Commit conflict on {table_identifier}, not retrying: {e}")
+                    raise
+                print(f"⚠ Commit conflict on {table_identifier}, reloading table and retrying: {e}")
+                self._table_cache.pop(table_identifier, None)
+                table = self._load_table_cached(table_identifier)
+                commit(table)
+        except Exception:
+            # Handle may be stale (concurrent writer) - force a reload next time
+            self._table_cache.pop(table_identifier, None)
+            raise
+        self._cache_table(table_identifier, table)
+        return table
+
+    def _get_arrow_schema(self, table_identifier: str, table):
+        """
+        Get the table's PyArrow schema and field-name order, cached per schema version
+
+        Returns:
+            Tuple of (arrow_schema, field_names)
+        """
+        schema = table.schema()
+        # table_uuid guards against a dropped and re-created table reusing schema_id 0
+        version = (table.metadata.table_uuid, schema.schema_id)
+        cached = self._arrow_schema_cache.get(table_identifier)
+        if cached and cached[0] == version:
+            self._arrow_schema_cache.move_to_end(table_identifier)
+            return cached[1], cached[2]
+
+        arrow_schema = schema.as_arrow()
+        field_names = tuple(field.name for field in arrow_schema)
+        self._arrow_schema_cache[table_identifier] = (version, arrow_schema, field_names)
+        self._arrow_schema_cache.move_to_end(table_identifier)
+        if len(self._arrow_schema_cache) > self._table_cache_max_entries:
+            self._arrow_schema_cache.popitem(last=False)
+        return arrow_schema, field_names
+
+    def _acquire_cursor(self) -> duckdb.DuckDBPyConnection:
+        """Take a pooled DuckDB cursor, opening an extra one if the pool is drained"""
+        try:
+            return self._cursor_pool.get_nowait()
+        except queue.Empty:
+            return self.conn.cursor()
+
+    def _release_cursor(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        """Return a cursor to the pool, closing it if the pool is already full"""
+        try:
+            self._cursor_pool.put_nowait(cursor)
+        except queue.Full:
+            cursor.close()
+
+    def _tenant_scan_reader(self, table_identifier: str, tenant_id: str,
+                            columns: Optional[set] = None):
+        """
+        Stream one tenant's rows from PyIceberg as Arrow record batches
+
+        The _tenant_id row filter is evaluated against manifest and file
+        statistics, so files holding only other tenants are never opened.
+        Only the tenant filter is pushed down: versioned reads must see every
+        version (deleted ones included) before picking the latest. Batches are
+        read as DuckDB consumes them, so the tenant is never held in memory whole.
+
+        Returns:
+            RecordBatchReader to register with DuckDB, or None to fall back to iceberg_scan
+        """
+        try:
+            from pyiceberg.expressions import EqualTo
+
+            table = self._load_table_cached(table_identifier)
+            scan = table.scan(
+                row_filter=EqualTo("_tenant_id", tenant_id),
+                selected_fields=tuple(columns) if columns else ("*",)
+            )
+            return scan.to_arrow_batch_reader()
+        except Exception as e:
+            print(f"⚠ Tenant scan pushdown unavailable, using iceberg_scan: {e}")
+            return None
+
+    @staticmethod
+    def _count_data_files(table) -> int:
+        """
+        Live data-file count of the current snapshot, without planning a scan
+
+        Uses the snapshot summary's running total; falls back to the manifest
+        list's per-manifest counts (no manifest or Parquet reads) if absent.
+        """
+        snapshot = table.current_snapshot()
+        if snapshot is None:
+            return 0
+
+        total = snapshot.summary.get('total-data-files') if snapshot.summary else None
+        if total is not None:
+            return int(total)
+
+        from pyiceberg.manifest import ManifestContent
+        return sum(
+            (manifest.added_files_count or 0) + (manifest.existing_files_count or 0)
+            for manifest in snapshot.manifests(table.io)
+            if manifest.content == ManifestContent.DATA
+        )
+
+    @staticmethod
+    def _net_deleted_records(table, since_snapshot_id: Optional[int]) -> int:
+        """
+        Rows removed by the snapshots committed after since_snapshot_id
+
+        A delete can commit a whole-file delete snapshot plus an overwrite that
+        rewrites partially matching files, so sum deleted minus re-added records.
+        """
+        deleted = 0
+        snapshot = table.current_snapshot()
+        while snapshot is not None and snapshot.snapshot_id != since_snapshot_id:
+            summary = snapshot.summary
+            if summary:
+                deleted += int(summary.get('deleted-records') or 0) - int(summary.get('added-records') or 0)
+            if snapshot.parent_snapshot_id is None:
+                break
+            snapshot = table.snapshot_by_id(snapshot.parent_snapshot_id)
+        return deleted
+
+    def _count_live_rows(self, table, tenant_id: str) -> Optional[int]:
+        """
+        Count a tenant's non-deleted rows, from manifest stats where possible
+
+        A file whose column bounds show it holds only this tenant and no
+        _deleted=true rows is counted from its record_count without opening it.
+        The remaining files are counted by DuckDB reading just those files.
+
+        Returns:
+            Row count, or None if the table has delete files (use iceberg_scan)
+        """
+        from pyiceberg.conversions import from_bytes
+        from pyiceberg.expressions import EqualTo
+
+        schema = table.schema()
+        tenant_field = schema.find_field("_tenant_id")
+        deleted_field = schema.find_field("_deleted")
+
+        row_count = 0
+        residual_paths = []
+        for task in table.scan(row_filter=EqualTo("_tenant_id", tenant_id)).plan_files():
+            if task.delete_files:
+                return None
+            data_file = task.file
+            null_counts = data_file.null_value_counts or {}
+            lower_bounds = data_file.lower_bounds or {}
+            upper_bounds = data_file.upper_bounds or {}
+
+            # Truncated string bounds never decode to the full tenant id, so
+            # long ids simply fall through to the DuckDB count
+            tenant_only = (
+                null_counts.get(tenant_field.field_id) == 0
+                and tenant_field.field_id in lower_bounds
+                and tenant_field.field_id in upper_bounds
+                and from_bytes(tenant_field.field_type, lower_bounds[tenant_field.field_id]) == tenant_id
+                and from_bytes(tenant_field.field_type, upper_bounds[tenant_field.field_id]) == tenant_id
+            )
+            no_deletes = (
+                null_counts.get(deleted_field.field_id) == data_file.record_count
+                or (deleted_field.field_id in upper_bounds
+                    and from_bytes(deleted_field.field_type, upper_bounds[deleted_field.field_id]) is False)
+            )
+
+            if tenant_only and no_deletes:
+                row_count += data_file.record_count
+            else:
+                residual_paths.append(data_file.file_path)
+
+        if residual_paths:
+            row_count += self.conn.execute(
+                """
+                SELECT COUNT(*) FROM read_parquet(?)
+                WHERE _deleted IS NOT TRUE AND _tenant_id = ?
+                """,
+                [residual_paths, tenant_id]
+            ).fetchone()[0]
+        return row_count
+
+    def _get_metadata_path(self, table_identifier: str, adaptive_ttl: bool = False) -> str:
         """
         Get metadata path with caching to avoid repeated Glue calls
 
         Args:
             table_identifier: Full table identifier
+            adaptive_ttl: Let read-mostly tables earn a longer cache TTL. Only for
+                plain reads - read-modify-write paths must not see older metadata
 
         Returns:
             Metadata location path
@@ -372,10 +817,13 @@ class FullIcebergOperations:
         cache_key = table_identifier
         now = time.time()
 
-        if cache_key in self._metadata_cache:
-             cached_path, cached_time = self._metadata_cache[cache_key]
-             if now - cached_time < self._cache_ttl:
+        entry = self._metadata_cache.get(cache_key)
+        if entry is not None:
+             cached_path, cached_time, ttl = entry
+             # A grown TTL only serves adaptive callers; others get the base window
+             if now - cached_time < (ttl if adaptive_ttl else min(ttl, self._cache_ttl)):
                  # Cache hit - saved a Glue API call!
+                 self._metadata_cache.move_to_end(cache_key)
                  self._cache_stats['metadata_hits'] += 1
                  # Glue API: $1 per million requests
                  self._cache_stats['estimated_savings'] += 0.000001
@@ -386,17 +834,22 @@ class FullIcebergOperations:
         if self._try_direct_metadata_path(table_identifier):
             direct_path = self._build_direct_metadata_path(table_identifier)
             if direct_path:
-                self._metadata_cache[cache_key] = (direct_path, now)
+                self._cache_metadata_path(cache_key, direct_path, now, self._cache_ttl)
                 self._cache_stats['metadata_hits'] += 1
                 return direct_path
 
         # Cache miss - load from catalog (expensive Glue call)
         self._cache_stats['metadata_misses'] += 1
-        table = self._get_catalog().load_table(table_identifier)
+        table = self._load_table_cached(table_identifier)
         metadata_path = table.metadata_location
 
-        # Update cache
-        self._metadata_cache[cache_key] = (metadata_path, now)
+        # Update cache - read-mostly tables earn a longer TTL each time the path is
+        # re-validated unchanged; writes drop the entry, which resets it to the base TTL
+        if adaptive_ttl and entry is not None and entry[0] == metadata_path:
+            ttl = min(entry[2] * 2, self._metadata_cache_max_ttl)
+        else:
+            ttl = self._cache_ttl
+        self._cache_metadata_path(cache_key, metadata_path, now, ttl)
 
         # Log cache effectiveness periodically
         total_requests = self._cache_stats['metadata_hits'] + self._cache_stats['metadata_misses']
@@ -416,20 +869,27 @@ class FullIcebergOperations:
         # This is just an optimization attempt, not a bypass
         return None  # Always use catalog for general purpose engine
 
-    def _get_namespace(self, tenant_id: str, namespace: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _get_namespace(tenant_id: str, namespace: str) -> str:
         """Get Iceberg namespace from tenant and namespace"""
         # Replace hyphens with underscores for valid SQL names
         return f"{tenant_id}_{namespace}".replace("-", "_")
 
-    def _get_table_identifier(self, tenant_id: str, namespace: str, table: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _get_table_identifier(tenant_id: str, namespace: str, table: str) -> str:
         """Get full Iceberg table identifier"""
-        ns = self._get_namespace(tenant_id, namespace)
+        ns = FullIcebergOperations._get_namespace(tenant_id, namespace)
         return f"{ns}.{table}"
 
     def _build_select_clause(self, projection: Optional[list], aggregations: Optional[list] = None) -> str:
         """
         Build SELECT clause from projection list and aggregations
 
+        The request is reduced to a hashable shape and the SQL is compiled once
+        per distinct shape (see _compile_select_clause).
+
         Args:
             projection: List of column names or ProjectionField objects
             aggregations: List of AggregateField objects
@@ -437,61 +897,89 @@ class FullIcebergOperations:
         Returns:
             SQL SELECT clause string
         """
-        from src.models import ProjectionField, AggregateField
+        # Common case: SELECT * with no aggregations - skip shape building entirely
+        if not aggregations and (not projection or projection == ["*"]):
+            return "*"
+
+        projection_shape = ()
+        if projection and projection != ["*"]:
+            projection_shape = tuple(
+                (proj.field, proj.upper, proj.lower, proj.trim, proj.cast, proj.alias)
+                if isinstance(proj, ProjectionField)
+                else proj if isinstance(proj, str) else str(proj)
+                for proj in projection
+            )
+
+        aggregation_shape = ()
+        if aggregations:
+            aggregation_shape = tuple(
+                (agg.function, agg.field, agg.distinct, agg.alias)
+                for agg in aggregations
+                if isinstance(agg, AggregateField)
+            )
 
+        return self._compile_select_clause(projection_shape, aggregation_shape)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=2048)
+    def _compile_select_clause(projection_shape: tuple, aggregation_shape: tuple) -> str:
+        """
+        Compile a SELECT clause from its request shape
+
+        Args:
+            projection_shape: Column names, or (field, upper, lower, trim, cast, alias) tuples
+            aggregation_shape: (function, field, distinct, alias) tuples
+
+        Returns:
+            SQL SELECT clause string
+        """
         select_parts = []
 
         # Handle regular projections (columns)
-        if projection and projection != ["*"]:
-            for proj in projection:
-                if isinstance(proj, str):
-                    # Simple column name
-                    select_parts.append(proj)
-                elif isinstance(proj, ProjectionField):
-                    # Complex projection with alias/transformations
-                    field = proj.field
-
-                    # Apply transformations
-                    if proj.upper:
-                        field = f"UPPER({field})"
-                    elif proj.lower:
-                        field = f"LOWER({field})"
-
-                    if proj.trim:
-                        field = f"TRIM({field})"
-
-                    if proj.cast:
-                        field = f"CAST({field} AS {proj.cast})"
-
-                    # Add alias if provided
-                    if proj.alias:
-                        field = f"{field} AS {proj.alias}"
-
-                    select_parts.append(field)
-                else:
-                    # Fallback to string representation
-                    select_parts.append(str(proj))
+        for proj in projection_shape:
+            if isinstance(proj, str):
+                # Simple column name
+                select_parts.append(proj)
+                continue
+
+            # Complex projection with alias/transformations
+            field, upper, lower, trim, cast, alias = proj
+
+            # Apply transformations
+            if upper:
+                field = f"UPPER({field})"
+            elif lower:
+                field = f"LOWER({field})"
+
+            if trim:
+                field = f"TRIM({field})"
+
+            if cast:
+                field = f"CAST({field} AS {cast})"
+
+            # Add alias if provided
+            if alias:
+                field = f"{field} AS {alias}"
+
+            select_parts.append(field)
 
         # Handle aggregations
-        if aggregations:
-            for agg in aggregations:
-                if isinstance(agg, AggregateField):
-                    # Build aggregation function
-                    func = agg.function.upper()
-
-                    if agg.field:
-                        # Aggregation on specific field
-                        if agg.distinct:
-                            agg_expr = f"{func}(DISTINCT {agg.field})"
-                        else:
-                            agg_expr = f"{func}({agg.field})"
-                    else:
-                        # COUNT(*) case
-                        agg_expr = f"{func}(*)"
+        for function, field, distinct, alias in aggregation_shape:
+            # Build aggregation function
+            func = function.upper()
+
+            if field:
+                # Aggregation on specific field
+                if distinct:
+                    agg_expr = f"{func}(DISTINCT {field})"
+                else:
+                    agg_expr = f"{func}({field})"
+            else:
+                # COUNT(*) case
+                agg_expr = f"{func}(*)"
 
-                    # Add alias
-                    agg_expr = f"{agg_expr} AS {agg.alias}"
-                    select_parts.append(agg_expr)
+            # Add alias
+            select_parts.append(f"{agg_expr} AS {alias}")
 
         # If no projections or aggregations specified, return all columns
         if not select_parts:
@@ -515,9 +1003,9 @@ class FullIcebergOperations:
                 if "already exists" not in str(e).lower():
                     print(f"Namespace creation note: {e}")
 
-            # Check if table exists
+            # Check if table exists (keeps the loaded handle for the writes that follow)
             try:
-                existing_table = self._get_catalog().load_table(table_identifier)
+                existing_table = self._load_table_cached(table_identifier)
                 if not request.if_not_exists:
                     from src.models import ResponseMetadata
                     return CreateTableResponse(
@@ -526,15 +1014,9 @@ class FullIcebergOperations:
                         metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
                         error=ErrorDetail(code="TABLE_EXISTS", message="Table already exists")
                     )
-                from src.models import CreateTableResponseData, ResponseMetadata
-                return CreateTableResponse(
-                    success=True,
-                    data=CreateTableResponseData(
-                        table_created=False,
-                        table_existed=True
-                    ),
-                    metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                    error=None
+                return CreateTableResponse.ok(
+                    table_created=False,
+                    table_existed=True
                 )
             except:
                 pass  # Table doesn't exist, create it
@@ -585,21 +1067,19 @@ class FullIcebergOperations:
             print(f"Schema: {schema}")
 
             # Create table (location is determined by catalog warehouse config)
+            # Pin fast-append commits: a catalog-level table default enabling manifest
+            # merging would otherwise rewrite manifests synchronously on every write
             table = self._get_catalog().create_table(
                 identifier=table_identifier,
-                schema=schema
+                schema=schema,
+                properties={"commit.manifest-merge.enabled": "false"}
             )
+            self._cache_table(table_identifier, table)
 
             print(f"✓ Created Iceberg table: {table_identifier}")
-            from src.models import CreateTableResponseData, ResponseMetadata
-            return CreateTableResponse(
-                success=True,
-                data=CreateTableResponseData(
-                    table_created=True,
-                    table_existed=False
-                ),
-                metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                error=None
+            return CreateTableResponse.ok(
+                table_created=True,
+                table_existed=False
             )
 
         except Exception as e:
@@ -612,149 +1092,306 @@ class FullIcebergOperations:
             )
 
     def write(self, request: WriteRequest) -> WriteResponse:
-        """Write records to Iceberg table using PyIceberg and Polars"""
+        """Write records to Iceberg table using PyIceberg and PyArrow"""
         try:
             table_identifier = self._get_table_identifier(
                 request.tenant_id, request.namespace, request.table
             )
+            record_count = len(request.records)
 
-            # Load Iceberg table
-            table = self._get_catalog().load_table(table_identifier)
-
-            # Enrich records with system fields
-            timestamp = datetime.utcnow()
-            enriched_records = []
-
-            for record in request.records:
-                enriched = record.copy()
-                enriched.update({
-                    "_tenant_id": request.tenant_id,
-                    "_record_id": hashlib.md5(
-                        json.dumps(record, sort_keys=True).encode()
-                    ).hexdigest(),
-                    "_timestamp": timestamp,
-                    "_version": 1,
-                    "_deleted": False,
-                    "_deleted_at": None
-                })
-                enriched_records.append(enriched)
-
-            # Convert to Polars DataFrame with proper schema (Polars is 2-10x faster than Pandas)
-            # Use lazy evaluation for better performance
-            df = pl.DataFrame(enriched_records)
-
-            # Ensure proper data types for system fields - use lazy evaluation
-            df = df.lazy().with_columns([
-                pl.col("_tenant_id").cast(pl.Utf8),
-                pl.col("_record_id").cast(pl.Utf8),
-                pl.col("_timestamp").cast(pl.Datetime),
-                pl.col("_version").cast(pl.Int32),
-                pl.col("_deleted").cast(pl.Boolean),
-                pl.col("_deleted_at").cast(pl.Datetime, strict=False)
-            ]).collect()  # Execute lazy operations
-
-            # Get Iceberg table schema first to check for missing columns
-            iceberg_schema = table.schema().as_arrow()
-            
-            # CRITICAL FIX: Ensure all schema columns exist in DataFrame before conversion
-            # Polars drops columns that are missing from input dicts, but PyArrow select() requires them
-            missing_fields = []
-            for field in iceberg_schema:
-                if field.name not in df.columns:
-                    missing_fields.append(pl.lit(None).alias(field.name))
-                    print(f"  Gap-filling missing field: {field.name}")
-            
-            if missing_fields:
-                df = df.with_columns(missing_fields)
-
-            # Convert to PyArrow table (lazy load PyArrow)
-            arrow_table = df.to_arrow()
-
-            # Reorder columns to match Iceberg schema field order
-            field_names = [field.name for field in iceberg_schema]
-            arrow_table = arrow_table.select(field_names)
-
-            # Cast the arrow table to match Iceberg schema exactly
-            # This ensures field types and nullability match
-            arrow_table = arrow_table.cast(iceberg_schema)
-
-            # Append to Iceberg table
-            table.append(arrow_table)
+            compaction_recommended, small_files_count = self._append_records(
+                table_identifier, request.tenant_id, [request.records]
+            )
 
-            print(f"✓ Wrote {len(enriched_records)} records to {table_identifier}")
+            from src.models import WriteResponseData, ResponseMetadata
+            return WriteResponse(
+                success=True,
+                data=WriteResponseData(
+                    records_written=record_count,
+                    compaction_recommended=compaction_recommended,
+                    small_files_count=small_files_count
+                ),
+                metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
+                error=None
+            )
 
-            # Invalidate metadata + query caches for immediate consistency
-            if table_identifier in self._metadata_cache:
-                del self._metadata_cache[table_identifier]
-            stale_keys = [k for k in self._query_cache if request.table in k]
-            for k in stale_keys:
-                del self._query_cache[k]
+        except Exception as e:
+            from src.models import ResponseMetadata
+            return WriteResponse(
+                success=False,
+                data=None,
+                metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
+                error=ErrorDetail(code="WRITE_ERROR", message=str(e))
+            )
 
-            # Opportunistic compaction check (non-blocking)
-            compaction_recommended = False
-            small_files_count = None
+    def write_batch(self, request: WriteBatchRequest) -> WriteBatchResponse:
+        """
+        Write several record sets with one Iceberg commit per table
 
-            try:
-                # Get compaction config using nested keys
-                compaction_config = self.config.get('iceberg', 'compaction')
+        Writes to the same table are concatenated and appended together, so N
+        writes cost one snapshot instead of N. Each write reports its own
+        result: a write whose records don't fit the table schema fails alone,
+        and the other writes to that table still commit. Tables commit
+        independently, so a failed commit only fails that table's writes.
 
-                if compaction_config.get('enabled', True):
-                    # Check every Nth write using snapshot count
-                    check_interval = compaction_config.get('opportunistic_check_interval', 100)
+        When some writes committed and others failed the response has error
+        code PARTIAL_WRITE: clients must resend only the failed items.
+        """
+        try:
+            # Group write indexes by table, keeping first-seen order
+            writes_by_table: Dict[str, List[int]] = {}
+            for index, item in enumerate(request.writes):
+                writes_by_table.setdefault(item.table, []).append(index)
 
-                    # Reload table to get updated metadata
-                    table = self._get_catalog().load_table(table_identifier)
-                    snapshot_count = len(list(table.history()))
+            items: List[Optional[WriteBatchItemResult]] = [None] * len(request.writes)
 
-                    # Check if it's time to evaluate compaction
-                    if snapshot_count % check_interval == 0:
-                        # Quick file inspection
-                        small_file_threshold_mb = compaction_config.get('small_file_threshold_mb', 64)
-                        small_file_threshold_bytes = small_file_threshold_mb * 1024 * 1024
-                        min_files_to_compact = compaction_config.get('min_files_to_compact', 10)
+            def fail(index: int, code: str, error: Exception) -> None:
+                items[index] = WriteBatchItemResult(
+                    table=request.writes[index].table,
+                    success=False,
+                    error=ErrorDetail(code=code, message=str(error))
+                )
 
-                        # Inspect files using scan().plan_files()
-                        scan_tasks = list(table.scan().plan_files())
-                        small_files = [
-                            task for task in scan_tasks
-                            if task.file.file_size_in_bytes < small_file_threshold_bytes
-                        ]
+            for table_name, indexes in writes_by_table.items():
+                table_identifier = self._get_table_identifier(
+                    request.tenant_id, request.namespace, table_name
+                )
+                try:
+                    table = self._load_table_cached(table_identifier)
+                    iceberg_schema, _ = self._get_arrow_schema(table_identifier, table)
+                except Exception as e:
+                    for i in indexes:
+                        fail(i, "WRITE_ERROR", e)
+                    continue
 
-                        small_files_count = len(small_files)
+                # Build each write on its own so a bad payload only fails its write
+                built = {}
+                for i in indexes:
+                    try:
+                        built[i] = self._build_write_table(
+                            request.writes[i].records, request.tenant_id, iceberg_schema
+                        )
+                    except Exception as e:
+                        fail(i, "VALIDATION_ERROR", e)
+                if not built:
+                    continue
 
-                        if len(small_files) >= min_files_to_compact:
-                            compaction_recommended = True
-                            print(f"⚠ Compaction recommended: {len(small_files)} small files detected")
+                try:
+                    compaction_recommended, small_files_count = self._append_arrow_tables(
+                        table_identifier, table, list(built.values())
+                    )
+                except Exception as e:
+                    for i in built:
+                        fail(i, "WRITE_ERROR", e)
+                    continue
 
-            except Exception as e:
-                # Don't fail write if compaction check fails
-                print(f"Warning: Compaction check failed: {e}")
+                for i, arrow_table in built.items():
+                    items[i] = WriteBatchItemResult(
+                        table=table_name,
+                        success=True,
+                        data=WriteResponseData(
+                            records_written=arrow_table.num_rows,
+                            compaction_recommended=compaction_recommended,
+                            small_files_count=small_files_count
+                        )
+                    )
 
-            # Log compaction recommendation (but don't auto-trigger)
-            if compaction_recommended:
-                print(f"💡 Consider running COMPACT operation: {small_files_count} small files detected")
+            failed = [i for i, item in enumerate(items) if not item.success]
+            print(f"✓ Batched {len(request.writes) - len(failed)} of {len(request.writes)} writes "
+                  f"into {len(writes_by_table)} table(s)")
+            if not failed:
+                return WriteBatchResponse.ok(items=items)
 
-            from src.models import WriteResponseData, ResponseMetadata
-            return WriteResponse(
-                success=True,
-                data=WriteResponseData(
-                    records_written=len(enriched_records),
-                    compaction_recommended=compaction_recommended,
-                    small_files_count=small_files_count
-                ),
+            # Committed writes stay committed: report them alongside the failures
+            # so a retry resends only the failed items instead of duplicating rows
+            partial = len(failed) < len(request.writes)
+            return WriteBatchResponse(
+                success=False,
+                data=WriteBatchResponseData(items=items),
                 metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                error=None
+                error=ErrorDetail(
+                    code="PARTIAL_WRITE" if partial else "WRITE_ERROR",
+                    message=f"{len(failed)} of {len(request.writes)} writes failed",
+                    details={"failed_items": failed}
+                )
             )
 
         except Exception as e:
-            from src.models import ResponseMetadata
-            return WriteResponse(
+            return WriteBatchResponse(
                 success=False,
                 data=None,
                 metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
                 error=ErrorDetail(code="WRITE_ERROR", message=str(e))
             )
 
+    def _append_records(self, table_identifier: str, tenant_id: str,
+                        record_sets: List[List[Dict[str, Any]]]) -> Tuple[bool, Optional[int]]:
+        """
+        Append one or more record sets to a table in a single commit
+
+        Returns:
+            Latest (compaction_recommended, small_files_count) hint for the table
+        """
+        # Load Iceberg table
+        table = self._load_table_cached(table_identifier)
+
+        # Build the Arrow tables in the Iceberg schema, system fields included
+        iceberg_schema, _ = self._get_arrow_schema(table_identifier, table)
+        return self._append_arrow_tables(table_identifier, table, [
+            self._build_write_table(records, tenant_id, iceberg_schema)
+            for records in record_sets
+        ])
+
+    def _append_arrow_tables(self, table_identifier: str, table,
+                             arrow_tables: list) -> Tuple[bool, Optional[int]]:
+        """
+        Append Arrow tables built in the table's Iceberg schema in a single commit
+
+        Returns:
+            Latest (compaction_recommended, small_files_count) hint for the table
+        """
+        if len(arrow_tables) == 1:
+            arrow_table = arrow_tables[0]
+        else:
+            arrow_table = _get_pyarrow().concat_tables(arrow_tables)
+
+        # Append to Iceberg table (a fast append - new manifest, no merge)
+        table = self._commit_with_retry(
+            table_identifier, table, lambda table: table.append(arrow_table)
+        )
+
+        print(f"✓ Wrote {arrow_table.num_rows} records to {table_identifier}")
+
+        # Invalidate metadata + query caches for immediate consistency
+        if table_identifier in self._metadata_cache:
+            del self._metadata_cache[table_identifier]
+        self._invalidate_query_cache(table_identifier)
+
+        # Opportunistic compaction check - runs on the housekeeping thread so the
+        # probe's manifest reads never add to write latency
+        try:
+            # Get compaction config using nested keys
+            compaction_config = self.config.get('iceberg', 'compaction')
+
+            if compaction_config.get('enabled', True):
+                # Check every Nth write using snapshot count
+                check_interval = compaction_config.get('opportunistic_check_interval', 100)
+
+                # append() refreshed the table in place - snapshot count comes
+                # straight from the loaded metadata, no history() walk
+                snapshot_count = len(table.metadata.snapshots)
+
+                # Check if it's time to evaluate compaction. The probe gets the
+                # (immutable) snapshot, never the live Table later writes refresh
+                if snapshot_count % check_interval == 0:
+                    self._housekeeping.submit(
+                        self._probe_compaction, table_identifier,
+                        table.current_snapshot(), table.io, compaction_config
+                    )
+
+        except Exception as e:
+            # Don't fail write if compaction check fails
+            print(f"Warning: Compaction check failed: {e}")
+
+        # Report the most recent probe result for this table (may lag by one check)
+        with self._compaction_hints_lock:
+            compaction_recommended, small_files_count, _ = self._compaction_hints.get(
+                table_identifier, (False, None, None)
+            )
+
+        # Log compaction recommendation (but don't auto-trigger)
+        if compaction_recommended:
+            print(f"💡 Consider running COMPACT operation: {small_files_count} small files detected")
+
+        return compaction_recommended, small_files_count
+
+    def _build_write_table(self, records: List[Dict[str, Any]], tenant_id: str, iceberg_schema):
+        """
+        Convert write payload records into an Arrow table matching the Iceberg schema
+
+        Typed payloads convert straight into the target schema. Payloads that need
+        coercion (e.g. ISO strings for timestamp columns) are converted column by
+        column, casting only the columns that fail typed conversion.
+        """
+        pa = _get_pyarrow()
+        timestamp = _utcnow()
+        record_ids = _content_record_ids(records)
+        system_values = {
+            "_tenant_id": tenant_id,
+            "_timestamp": timestamp,
+            "_version": 1,
+            "_deleted": False,
+            "_deleted_at": None
+        }
+
+        try:
+            # Fast path: one row-wise conversion straight into the target schema
+            arrow_table = pa.Table.from_pylist(records, schema=iceberg_schema)
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            # Column-wise conversion: only the columns that need coercion pay for
+            # an inferred array plus a cast. Schema fields missing from every
+            # record come out as all-null columns, so no gap-filling is needed
+            arrays = [
+                pa.nulls(len(records), type=field.type)
+                if field.name in system_values or field.name == "_record_id"
+                else _coerce_array([r.get(field.name) for r in records], field.type)
+                for field in iceberg_schema
+            ]
+            arrow_table = pa.Table.from_arrays(arrays, schema=iceberg_schema)
+
+        for name, value in system_values.items():
+            index = iceberg_schema.get_field_index(name)
+            field = iceberg_schema.field(index)
+            arrow_table = arrow_table.set_column(
+                index, field, pa.repeat(pa.scalar(value, type=field.type), len(records))
+            )
+        index = iceberg_schema.get_field_index("_record_id")
+        field = iceberg_schema.field(index)
+        return arrow_table.set_column(index, field, pa.array(record_ids, type=field.type))
+
+    def _probe_compaction(self, table_identifier: str, snapshot, io,
+                          compaction_config: Dict[str, Any]) -> None:
+        """Count small files in a snapshot and record a compaction hint (runs on the housekeeping thread)"""
+        try:
+            # Quick file inspection
+            small_file_threshold_mb = compaction_config.get('small_file_threshold_mb', 64)
+            small_file_threshold_bytes = small_file_threshold_mb * 1024 * 1024
+            min_files_to_compact = compaction_config.get('min_files_to_compact', 10)
+
+            # The snapshot summary's file total bounds the small-file count,
+            # so only read manifests when enough files exist to matter
+            total_data_files = int(snapshot.summary.get('total-data-files') or 0) if snapshot and snapshot.summary else None
+
+            small_files_count = None
+            if snapshot is not None and (total_data_files is None or total_data_files >= min_files_to_compact):
+                # Walk the data manifests one at a time and stop as soon as the
+                # threshold is reached - the count is then a lower bound, and the
+                # remaining manifests are never fetched
+                from pyiceberg.manifest import ManifestContent
+                small_files_count = 0
+                for manifest in snapshot.manifests(io):
+                    if manifest.content != ManifestContent.DATA:
+                        continue
+                    for entry in manifest.fetch_manifest_entry(io, discard_deleted=True):
+                        if entry.data_file.file_size_in_bytes < small_file_threshold_bytes:
+                            small_files_count += 1
+                    if small_files_count >= min_files_to_compact:
+                        break
+
+            compaction_recommended = small_files_count is not None and small_files_count >= min_files_to_compact
+            if compaction_recommended:
+                print(f"⚠ Compaction recommended: {small_files_count} small files detected in {table_identifier}")
+
+            with self._compaction_hints_lock:
+                self._compaction_hints[table_identifier] = (compaction_recommended, small_files_count, time.time())
+
+        except Exception as e:
+            print(f"Warning: Compaction check failed: {e}")
+
+    def close(self) -> None:
+        """Wait for pending housekeeping work and stop its thread"""
+        self._housekeeping.shutdown(wait=True)
+
     def _fast_json_response(self, data: Any) -> str:
         """
         Use orjson for 3x faster JSON serialization
@@ -831,7 +1468,8 @@ class FullIcebergOperations:
             where_clause = " AND ".join(where_conditions)
 
             # Add tenant and deletion filters
-            base_conditions = [f"s.\"_tenant_id\" = '{request.tenant_id}'"]
+            tenant_literal = request.tenant_id.replace("'", "''")
+            base_conditions = [f"s.\"_tenant_id\" = '{tenant_literal}'"]
             if not request.include_deleted:
                 base_conditions.append("s.\"_deleted\" != true")
 
@@ -870,76 +1508,74 @@ class FullIcebergOperations:
 
     def query(self, request: QueryRequest) -> QueryResponse:
         """Query Iceberg table using DuckDB's iceberg_scan with metadata caching"""
-        import uuid
-        from src.models import QueryResponse, QueryResponseData, QueryMetadata, ResponseMetadata
-
-        query_start = time.time()
+        query_start = time.perf_counter()
         query_id = str(uuid.uuid4())
         cache_hit = False
 
-        # Create cache key from request parameters for query result caching
-        cache_key_parts = [
-            request.tenant_id,
-            request.namespace,
-            request.table,
+        table_identifier = self._get_table_identifier(
+            request.tenant_id, request.namespace, request.table
+        )
+
+        # Tuple cache key: hashed natively by the dict (no md5/join). The table
+        # identifier (tenant-qualified) leads, so invalidation touches only that table
+        query_cache_key = (
+            table_identifier,
             str(request.filters) if request.filters else "",
             str(request.projection) if request.projection else "*",
             str(request.aggregations) if request.aggregations else "",
             str(request.group_by) if request.group_by else "",
             str(request.having) if request.having else "",
             str(request.sort) if request.sort else "",
-            str(request.limit) if request.limit else "",
-            str(request.include_deleted)
-        ]
-        query_cache_key = hashlib.md5(":".join(cache_key_parts).encode()).hexdigest()
+            request.limit,
+            request.include_deleted
+        )
 
         # Check query result cache
         if query_cache_key in self._query_cache:
-            cached_result, cached_time = self._query_cache[query_cache_key]
+            cached_response, cached_time = self._query_cache[query_cache_key]
             if time.time() - cached_time < self._query_cache_ttl:
                 # Cache hit - saved S3 reads!
+                self._query_cache.move_to_end(query_cache_key)
                 self._cache_stats['query_hits'] += 1
                 # S3 GET: $0.0004 per 1000 requests, Data transfer: ~$0.09/GB
                 # Estimate ~10 S3 GETs and 100MB per query
                 self._cache_stats['estimated_savings'] += (10 * 0.0004 / 1000) + (0.1 * 0.09)
 
-                # Update metadata to indicate cache hit
-                cached_result['data']['query_metadata']['cache_hit'] = True
-                cached_result['data']['query_metadata']['query_id'] = query_id
-                cached_result['data']['query_metadata']['cost_saved'] = f"${self._cache_stats['estimated_savings']:.4f}"
-                return QueryResponse(**cached_result)
+                # Return the cached model with hit metadata - shallow copies share the
+                # records, so nothing is re-validated or deep-copied
+                cached_data = cached_response.data
+                query_metadata = replace(cached_data.query_metadata, cache_hit=True, query_id=query_id)
+                return cached_response.model_copy(
+                    update={"data": cached_data.model_copy(update={"query_metadata": query_metadata})}
+                )
 
         # Cache miss
         self._cache_stats['query_misses'] += 1
 
         try:
-            table_identifier = self._get_table_identifier(
-                request.tenant_id, request.namespace, request.table
-            )
-
             # Get table metadata location from cache (fast) or catalog (slow)
             try:
                 # Check if this will be a cache hit
                 cache_key = table_identifier
                 if cache_key in self._metadata_cache:
-                    cached_path, cached_time = self._metadata_cache[cache_key]
-                    if time.time() - cached_time < self._cache_ttl:
+                    cached_path, cached_time, ttl = self._metadata_cache[cache_key]
+                    if time.time() - cached_time < ttl:
                         cache_hit = True
 
-                metadata_path = self._get_metadata_path(table_identifier)
+                metadata_path = self._get_metadata_path(table_identifier, adaptive_ttl=True)
 
                 # Try S3 Select for simple filtered queries (50-100ms response!)
                 s3_select_result = self._try_s3_select(request, metadata_path)
                 if s3_select_result is not None:
                     # S3 Select succeeded - return ultra-fast results
-                    print(f"  ✓ S3 Select query completed in {(time.time() - query_start) * 1000:.2f}ms")
+                    print(f"  ✓ S3 Select query completed in {(time.perf_counter() - query_start) * 1000:.2f}ms")
                     return QueryResponse(
                         success=True,
                         data=QueryResponseData(
                             records=s3_select_result,
                             query_metadata=QueryMetadata(
                                 row_count=len(s3_select_result),
-                                execution_time_ms=round((time.time() - query_start) * 1000, 2),
+                                execution_time_ms=round((time.perf_counter() - query_start) * 1000, 2),
                                 cache_hit=False,
                                 query_id=query_id,
                                 warnings=["S3 Select optimization used"]
@@ -971,6 +1607,7 @@ class FullIcebergOperations:
             # Optimize column scanning - only read required columns from Parquet files
             # This reduces S3 data transfer significantly
             scan_columns = "*"  # Default to all columns
+            required_columns = None
             if request.projection and request.projection != ["*"] and not request.aggregations:
                 # Build list of columns to scan from storage
                 # Always include system columns needed for filtering
@@ -993,9 +1630,40 @@ class FullIcebergOperations:
 
                 scan_columns = ", ".join(required_columns)
                 print(f"  ↓ Projection pushdown: scanning only {len(required_columns)} columns instead of all")
+            elif request.aggregations:
+                # Aggregations read only their inputs, group keys and filter columns.
+                # Sort and HAVING name group keys or aggregate aliases, which the
+                # scan never produces. Dotted (nested) references keep the full scan
+                projection = [] if not request.projection or request.projection == ["*"] else request.projection
+                input_columns = {agg.field for agg in request.aggregations if agg.field}
+                input_columns.update(request.group_by or [])
+                input_columns.update(filter_item.field for filter_item in request.filters or [])
+                if all(isinstance(proj, str) for proj in projection):
+                    input_columns.update(projection)
+                    if all(column.isidentifier() for column in input_columns):
+                        input_columns.update(['_tenant_id', '_record_id', '_version', '_deleted'])
+                        scan_columns = ", ".join(sorted(input_columns))
+                        print(f"  ↓ Projection pushdown: scanning only {len(input_columns)} columns instead of all")
 
             # Build DuckDB query using iceberg_scan with metadata file
-            # OPTIMIZATION: Skip expensive ROW_NUMBER() if not needed
+            # OPTIMIZATION: Skip the latest-version aggregation if not needed
+            # The metadata path is bound like every other value, so the SQL text
+            # depends only on the request shape
+            scan_source = "iceberg_scan(?)"
+            scan_params = [metadata_path]
+
+            # Row-level queries: let PyIceberg prune data files by the tenant's
+            # manifest stats and stream DuckDB only that tenant's rows (registered
+            # on the query's cursor below). Aggregations stay on iceberg_scan
+            tenant_scan = None
+            if (not request.aggregations and not request.group_by
+                    and os.environ.get('ICEBERG_SCAN_PUSHDOWN', 'true').lower() == 'true'):
+                tenant_scan = self._tenant_scan_reader(
+                    table_identifier, request.tenant_id, required_columns
+                )
+                if tenant_scan is not None:
+                    scan_source = "tenant_scan"
+                    scan_params = []
             deleted_filter = "" if request.include_deleted else "AND _deleted IS NOT TRUE"
 
             # Check if we need versioning (only if table has updates)
@@ -1004,54 +1672,58 @@ class FullIcebergOperations:
             skip_versioning_default = os.environ.get('SKIP_VERSIONING_DEFAULT', 'false').lower() == 'true'
             needs_versioning = not (getattr(request, 'skip_versioning', skip_versioning_default))
 
+            # _tenant_id and _record_id are identical on every version of a record, so
+            # filters on them select whole records and can run inside the scan, ahead
+            # of the latest-version aggregation. Other filters must see only the
+            # latest version and stay outside it
+            row_filters = request.filters or []
+            scan_filter = ""
+            scan_filter_params = []
+            if needs_versioning and row_filters:
+                record_filters = [f for f in row_filters if f.field in VERSION_INVARIANT_COLUMNS]
+                if record_filters:
+                    record_filter_sql, scan_filter_params = self._query_builder._build_filters(record_filters, "")
+                    scan_filter = f"AND ({record_filter_sql})"
+                    row_filters = [f for f in row_filters if f.field not in VERSION_INVARIANT_COLUMNS]
+
             if needs_versioning:
-                # Original query with ROW_NUMBER (slower but handles versions)
-                # FIX: Apply _deleted filter BEFORE selecting latest version
-                # This ensures we get the latest NON-DELETED version
-                if not request.include_deleted:
-                    # FIX: Get the absolute latest version first, THEN check if deleted
-                    # This ensures that if a record is deleted, we don't return old versions
-                    sql = f"""
-                        WITH ranked_records AS (
-                            SELECT {scan_columns},
-                                   ROW_NUMBER() OVER (
-                                       PARTITION BY _record_id
-                                       ORDER BY _version DESC
-                                   ) as rn
-                            FROM iceberg_scan('{metadata_path}')
-                            WHERE _tenant_id = '{request.tenant_id}'
-                        )
-                        SELECT {select_clause} FROM ranked_records
-                        WHERE rn = 1 AND _deleted IS NOT TRUE
-                    """
-                else:
-                    # Include deleted records - get absolute latest version
-                    sql = f"""
-                        WITH ranked_records AS (
-                            SELECT {scan_columns},
-                                   ROW_NUMBER() OVER (PARTITION BY _record_id ORDER BY _version DESC) as rn
-                            FROM iceberg_scan('{metadata_path}')
-                            WHERE _tenant_id = '{request.tenant_id}'
-                        )
-                        SELECT {select_clause} FROM ranked_records
-                        WHERE rn = 1
-                    """
+                # Latest version per record via one hash aggregation: arg_max keeps the
+                # whole row (as a struct) with the highest _version, no window sort.
+                # FIX: Get the absolute latest version first, THEN check if deleted
+                # This ensures that if a record is deleted, we don't return old versions
+                latest_filter = "TRUE" if request.include_deleted else "_deleted IS NOT TRUE"
+                sql = f"""
+                    WITH latest_records AS (
+                        SELECT arg_max(t, _version) AS r
+                        FROM (
+                            SELECT {scan_columns}
+                            FROM {scan_source}
+                            WHERE _tenant_id = ?
+                            {scan_filter}
+                        ) t
+                        GROUP BY _record_id
+                    )
+                    SELECT {select_clause} FROM (SELECT r.* FROM latest_records)
+                    WHERE {latest_filter}
+                """
             else:
                 # FAST PATH: Simple query without versioning (much faster!)
                 sql = f"""
                     SELECT {select_clause}
-                    FROM iceberg_scan('{metadata_path}')
-                    WHERE _tenant_id = '{request.tenant_id}'
+                    FROM {scan_source}
+                    WHERE _tenant_id = ?
                     {deleted_filter}
                 """
 
+            # Values are bound as parameters in the order their placeholders appear
+            params = [*scan_params, request.tenant_id, *scan_filter_params]
+
             # Add custom filters
-            params = []
-            if request.filters:
-                builder = TypeSafeQueryBuilder()
-                filter_sql, params = builder._build_filters(request.filters, "")
+            if row_filters:
+                filter_sql, filter_params = self._query_builder._build_filters(row_filters, "")
                 if filter_sql:
                     sql += f" AND ({filter_sql})"
+                    params.extend(filter_params)
 
             # Add GROUP BY clause
             if request.group_by:
@@ -1060,8 +1732,7 @@ class FullIcebergOperations:
 
             # Add HAVING clause (post-aggregation filter)
             if request.having:
-                builder = TypeSafeQueryBuilder()
-                having_sql, having_params = builder._build_filters(request.having, "")
+                having_sql, having_params = self._query_builder._build_filters(request.having, "")
                 if having_sql:
                     sql += f" HAVING {having_sql}"
                     if having_params:
@@ -1076,63 +1747,45 @@ class FullIcebergOperations:
 
             # Add limit
             if request.limit:
-                sql += f" LIMIT {request.limit}"
+                sql += " LIMIT ?"
+                params.append(request.limit)
 
             # Execute query with compiled plan optimization (30% faster)
-            query_exec_start = time.time()
-
-            # Try to use compiled query plan for common query patterns
-            if self._use_compiled_queries(sql):
-                # Create a template key for query compilation
-                # Replace specific values with placeholders for reusability
-                sql_template = sql
-                if not params:  # Simple query without params - can compile directly
-                    if sql_template not in self._compiled_queries:
-                        try:
-                            # Compile and cache the query plan
-                            self._compiled_queries[sql_template] = self.conn.prepare(sql)
-                            print(f"  ⚡ Query plan compiled and cached")
-                        except Exception as e:
-                            # Fall back to regular execution if compilation fails
-                            print(f"  Query compilation failed: {e}")
-                            result = self.conn.execute(sql).fetchdf()
-                    else:
-                        # Execute pre-compiled query (30% faster)
-                        try:
-                            result = self._compiled_queries[sql_template].execute().fetchdf()
-                            print(f"  ⚡ Using compiled query plan (30% faster)")
-                        except Exception:
-                            # Recompile if stale
-                            del self._compiled_queries[sql_template]
-                            result = self.conn.execute(sql).fetchdf()
-                else:
-                    # Query with params - execute normally
-                    result = self.conn.execute(sql, params).fetchdf()
-            else:
-                # Regular execution
-                if params:
-                    result = self.conn.execute(sql, params).fetchdf()
-                else:
-                    result = self.conn.execute(sql).fetchdf()
+            query_exec_start = time.perf_counter()
 
-            query_exec_time = (time.time() - query_exec_start) * 1000
+            # tenant_id is always bound, so every query runs parameterized. Fetch
+            # as Arrow and convert rows in C - no pandas DataFrame round trip
+            cursor = None
+            try:
+                cursor = self._acquire_cursor()
+                if tenant_scan is not None:
+                    cursor.register("tenant_scan", tenant_scan)
+                arrow_result = _arrow_table(cursor.execute(sql, params))
+            finally:
+                if cursor is not None:
+                    if tenant_scan is not None:
+                        cursor.unregister("tenant_scan")
+                    self._release_cursor(cursor)
+
+            query_exec_time = (time.perf_counter() - query_exec_start) * 1000
+
+            # DECIMAL columns keep returning floats, as they did via pandas
+            pa = _get_pyarrow()
+            for index, field in enumerate(arrow_result.schema):
+                if pa.types.is_decimal(field.type):
+                    arrow_result = arrow_result.set_column(
+                        index, field.name, arrow_result.column(index).cast(pa.float64())
+                    )
 
             # Convert to dict
-            data = result.to_dict(orient='records') if not result.empty else []
+            data = arrow_result.to_pylist()
             
             # Calculate total query time
-            total_time_ms = (time.time() - query_start) * 1000
+            total_time_ms = (time.perf_counter() - query_start) * 1000
             
-            # Estimate scanned bytes (rough estimate based on result size)
+            # Result size from the Arrow buffers - no second pass over the rows
             scanned_rows = len(data)
-            scanned_bytes = None
-            if data:
-                # Estimate bytes: sum of string lengths + fixed overhead per row
-                try:
-                    import sys
-                    scanned_bytes = sum(sys.getsizeof(str(v)) for row in data for v in row.values())
-                except:
-                    scanned_bytes = None
+            scanned_bytes = arrow_result.nbytes if data else None
 
             response = QueryResponse(
                 success=True,
@@ -1152,13 +1805,13 @@ class FullIcebergOperations:
                 error=None
             )
 
-            # Cache the successful query result
-            self._query_cache[query_cache_key] = (response.dict(), time.time())
+            # Cache the successful response model itself - no .dict() deep copy per query
+            self._query_cache[query_cache_key] = (response, time.time())
 
-            # Simple LRU cache - limit size
-            if len(self._query_cache) > 100:
-                oldest_key = next(iter(self._query_cache))
-                del self._query_cache[oldest_key]
+            # LRU eviction - hits move entries to the end, so the front is least recent
+            self._query_cache.move_to_end(query_cache_key)
+            if len(self._query_cache) > self._query_cache_max_entries:
+                self._query_cache.popitem(last=False)
 
             return response
 
@@ -1178,42 +1831,35 @@ class FullIcebergOperations:
             table_identifier = self._get_table_identifier(
                 request.tenant_id, request.namespace, request.table
             )
-            metadata_path = self._get_metadata_path(table_identifier)
+            # Read at the handle the new versions will be committed on, so the
+            # "latest version" is never older than the cached table
+            table = self._load_table_cached(table_identifier)
+            metadata_path = table.metadata_location
             
             # Build filter SQL
-            builder = TypeSafeQueryBuilder()
-            filter_sql, params = builder._build_filters(request.filters, "")
+            filter_sql, params = self._query_builder._build_filters(request.filters, "")
             
-            # Query to get only the LATEST NON-DELETED version of each matching record
-            # FIX: Prioritize non-deleted records when selecting latest version
+            # Query to get only the LATEST NON-DELETED version of each matching record:
+            # one hash aggregation keeps the highest-_version live row per _record_id
             sql = f"""
-                WITH ranked_records AS (
-                    SELECT *,
-                           ROW_NUMBER() OVER (
-                               PARTITION BY _record_id
-                               ORDER BY
-                                   CASE WHEN _deleted IS NOT TRUE THEN 0 ELSE 1 END,
-                                   _version DESC
-                           ) as rn
-                    FROM iceberg_scan('{metadata_path}')
-                    WHERE _tenant_id = '{request.tenant_id}'
-                      AND ({filter_sql})
+                WITH latest_records AS (
+                    SELECT arg_max(t, _version) AS r
+                    FROM (
+                        SELECT *
+                        FROM iceberg_scan(?)
+                        WHERE _tenant_id = ?
+                          AND _deleted IS NOT TRUE
+                          AND ({filter_sql})
+                    ) t
+                    GROUP BY _record_id
                 )
-                SELECT * FROM ranked_records WHERE rn = 1 AND _deleted IS NOT TRUE
+                SELECT r.* FROM latest_records
             """
             
-            # Execute query
-            if params:
-                result_df = self.conn.execute(sql, params).fetchdf()
-            else:
-                result_df = self.conn.execute(sql).fetchdf()
-            
-            # Remove the 'rn' column added by ROW_NUMBER
-            if 'rn' in result_df.columns:
-                result_df = result_df.drop('rn', axis=1)
-            
-            # Convert to list of records
-            records = result_df.to_dict(orient='records') if not result_df.empty else []
+            # Execute query - Arrow keeps timestamps typed (nulls stay None, never NaT)
+            records = _arrow_table(
+                self.conn.execute(sql, [metadata_path, request.tenant_id, *params])
+            ).to_pylist()
             
             # If no records found, return success with 0 updates
             if not records:
@@ -1228,70 +1874,59 @@ class FullIcebergOperations:
             # CRITICAL FIX: Create BOTH delete markers AND new versions
             # This is required because Iceberg is append-only
             # We must mark old versions as deleted and create new versions
-            timestamp = datetime.utcnow()
-            records_to_append = []
-
-            for record in records:
-                current_version = int(record.get("_version", 1))
-
-                # Create new version with updates (no delete marker for UPDATE operations)
-                updated_record = record.copy()
-                updated_record["_version"] = current_version + 1
-                updated_record["_timestamp"] = timestamp
+            timestamp = _utcnow()
 
-                # Check if this is a DELETE operation (updates contain _deleted=True)
-                # If so, don't reset _deleted to False
-                if request.updates.get("_deleted") == True:
-                    # This is a DELETE operation - keep deleted status
-                    updated_record["_deleted"] = True
-                    updated_record["_deleted_at"] = request.updates.get("_deleted_at", timestamp)
-                else:
-                    # Normal UPDATE - reset deleted status
-                    updated_record["_deleted"] = False
-                    updated_record["_deleted_at"] = None
-
-                # Handle NaT values before applying updates
-                if "_deleted_at" in updated_record:
-                    val = updated_record["_deleted_at"]
-                    if val is None or (isinstance(val, str) and val == "NaT") or str(val) == "NaT":
-                        updated_record["_deleted_at"] = None
-
-                # Apply user updates to the new version
-                updated_record.update(request.updates)
-                records_to_append.append(updated_record)
-
-            # Convert directly to PyArrow table using lazy-loaded PyArrow
-            pa = _get_pyarrow()
-            arrow_table = pa.Table.from_pylist(records_to_append)
-
-            # Load table and get schema (table_identifier already defined above)
-            table = self._get_catalog().load_table(table_identifier)
+            # Check if this is a DELETE operation (updates contain _deleted=True)
+            # If so, don't reset _deleted to False
+            if request.updates.get("_deleted") == True:
+                # This is a DELETE operation - keep deleted status
+                system_fields = {
+                    "_timestamp": timestamp,
+                    "_deleted": True,
+                    "_deleted_at": request.updates.get("_deleted_at", timestamp)
+                }
+            else:
+                # Normal UPDATE - reset deleted status
+                system_fields = {"_timestamp": timestamp, "_deleted": False, "_deleted_at": None}
+
+            # Create new version with updates (no delete marker for UPDATE operations);
+            # user updates are applied last
+            records_to_append = [
+                {
+                    **record,
+                    **system_fields,
+                    "_version": int(record.get("_version", 1)) + 1,
+                    **request.updates
+                }
+                for record in records
+            ]
 
             # Get Iceberg table schema as PyArrow schema
-            iceberg_schema = table.schema().as_arrow()
+            iceberg_schema, field_names = self._get_arrow_schema(table_identifier, table)
 
-            # Reorder columns to match Iceberg schema field order
-            field_names = [field.name for field in iceberg_schema]
-            arrow_table = arrow_table.select(field_names)
-
-            # Cast the arrow table to match Iceberg schema exactly
-            arrow_table = arrow_table.cast(iceberg_schema)
+            # Build straight into the Iceberg schema; updates that need coercion
+            # (e.g. ISO strings for timestamp columns) go through an Arrow cast
+            pa = _get_pyarrow()
+            try:
+                arrow_table = pa.Table.from_pylist(records_to_append, schema=iceberg_schema)
+            except (pa.ArrowTypeError, pa.ArrowInvalid):
+                arrow_table = pa.Table.from_pylist(records_to_append)
+                arrow_table = arrow_table.select(field_names).cast(iceberg_schema)
 
             # CRITICAL FIX: Use transaction for UPDATE to ensure commit
             # PyIceberg's append() may not auto-commit in all cases
             # We need to use a transaction to ensure the changes are persisted
 
             try:
-                # Append to Iceberg table
-                table.append(arrow_table)
-
-                # Force a new snapshot by reloading the table
-                # This ensures the append is committed to a new snapshot
-                catalog = self._get_catalog()
-                table = catalog.load_table(table_identifier)
+                # Append to Iceberg table (commits and refreshes the table in place)
+                # New versions were derived from the read above: never re-applied
+                table = self._commit_with_retry(
+                    table_identifier, table, lambda table: table.append(arrow_table),
+                    retry=False
+                )
 
                 # Verify the append worked by checking snapshot count
-                snapshot_count = len(list(table.history()))
+                snapshot_count = len(table.metadata.snapshots)
                 print(f"✓ Created new snapshot (total: {snapshot_count}) for UPDATE")
 
             except Exception as e:
@@ -1301,9 +1936,7 @@ class FullIcebergOperations:
             # Invalidate metadata + query caches to ensure immediate consistency
             if table_identifier in self._metadata_cache:
                 del self._metadata_cache[table_identifier]
-            stale_keys = [k for k in self._query_cache if request.table in k]
-            for k in stale_keys:
-                del self._query_cache[k]
+            self._invalidate_query_cache(table_identifier)
             print(f"✓ Invalidated caches for {table_identifier} after UPDATE")
 
             # Count only the actual updates (not delete markers)
@@ -1328,29 +1961,76 @@ class FullIcebergOperations:
             )
 
     def delete(self, request: DeleteRequest) -> DeleteResponse:
-        """Delete records (soft delete by marking _deleted=true)"""
+        """
+        Delete records (soft delete by marking _deleted=true)
+
+        Appends a new version of each matching record with the delete flags set.
+        The marker rows are built by DuckDB and fetched as Arrow, so row payloads
+        never round-trip through Python dicts.
+        """
         try:
-            # Soft delete by updating _deleted flag
-            update_req = UpdateRequest(
-                tenant_id=request.tenant_id,
-                namespace=request.namespace,
-                table=request.table,
-                updates={
-                    "_deleted": True,
-                    "_deleted_at": datetime.utcnow()
-                },
-                filters=request.filters
+            table_identifier = self._get_table_identifier(
+                request.tenant_id, request.namespace, request.table
             )
-            update_result = self.update(update_req)
+            # Read at the handle the markers will be committed on
+            table = self._load_table_cached(table_identifier)
+            metadata_path = table.metadata_location
+
+            # Build filter SQL
+            filter_sql, params = self._query_builder._build_filters(request.filters, "")
+            filter_clause = f"AND ({filter_sql})" if filter_sql else ""
+
+            # Same record selection as UPDATE: latest non-deleted version per
+            # _record_id, re-emitted as the next version with the delete flags set
+            deleted_at = _utcnow()
+            sql = f"""
+                WITH latest_records AS (
+                    SELECT arg_max(t, _version) AS r
+                    FROM (
+                        SELECT *
+                        FROM iceberg_scan(?)
+                        WHERE _tenant_id = ?
+                          AND _deleted IS NOT TRUE
+                          {filter_clause}
+                    ) t
+                    GROUP BY _record_id
+                )
+                SELECT * REPLACE (
+                    _version + 1 AS _version,
+                    ?::TIMESTAMP AS _timestamp,
+                    TRUE AS _deleted,
+                    ?::TIMESTAMP AS _deleted_at
+                )
+                FROM (SELECT r.* FROM latest_records)
+            """
+            markers = _arrow_table(self.conn.execute(
+                sql, [metadata_path, request.tenant_id, *params, deleted_at, deleted_at]
+            ))
+
+            records_deleted = markers.num_rows
+            if records_deleted:
+                iceberg_schema, field_names = self._get_arrow_schema(table_identifier, table)
+                markers = markers.select(field_names).cast(iceberg_schema)
+
+                # Markers were derived from the read above: never re-applied
+                self._commit_with_retry(
+                    table_identifier, table, lambda table: table.append(markers),
+                    retry=False
+                )
+
+                # Invalidate metadata + query caches to ensure immediate consistency
+                if table_identifier in self._metadata_cache:
+                    del self._metadata_cache[table_identifier]
+                self._invalidate_query_cache(table_identifier)
+
+                print(f"✓ Soft deleted {records_deleted} records in {table_identifier}")
 
             from src.models import DeleteResponseData, ResponseMetadata
             return DeleteResponse(
-                success=update_result.success,
-                data=DeleteResponseData(
-                    records_deleted=update_result.data.records_updated if update_result.data else 0
-                ) if update_result.success else None,
+                success=True,
+                data=DeleteResponseData(records_deleted=records_deleted),
                 metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                error=update_result.error
+                error=None
             )
 
         except Exception as e:
@@ -1386,39 +2066,7 @@ class FullIcebergOperations:
             )
 
             # Load table
-            table = self._get_catalog().load_table(table_identifier)
-
-            # First, query to count how many records will be deleted
-            metadata_path = table.metadata_location
-
-            # Build filter SQL
-            builder = TypeSafeQueryBuilder()
-            filter_sql, params = builder._build_filters(request.filters, "")
-
-            count_sql = f"""
-                SELECT COUNT(*) as count FROM iceberg_scan('{metadata_path}')
-                WHERE _tenant_id = '{request.tenant_id}'
-                AND ({filter_sql})
-            """
-
-            if params:
-                count_result = self.conn.execute(count_sql, params).fetchone()
-            else:
-                count_result = self.conn.execute(count_sql).fetchone()
-
-            records_to_delete = count_result[0] if count_result else 0
-
-            if records_to_delete == 0:
-                from src.models import HardDeleteResponseData, ResponseMetadata
-                return HardDeleteResponse(
-                    success=True,
-                    data=HardDeleteResponseData(
-                        records_deleted=0,
-                        files_rewritten=0
-                    ),
-                    metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                    error=None
-                )
+            table = self._load_table_cached(table_identifier)
 
             # Use PyIceberg's delete to physically remove rows
             # Build Iceberg filter expression from our filters array
@@ -1431,25 +2079,33 @@ class FullIcebergOperations:
             tenant_filter = EqualTo("_tenant_id", request.tenant_id)
             combined_filter = And(tenant_filter, iceberg_filter) if iceberg_filter else tenant_filter
 
-            # Execute physical deletion
-            files_before = len(list(table.scan().plan_files()))
-            table.delete(combined_filter)
+            # Execute physical deletion (no snapshot is committed if nothing matches).
+            # The "before" state is taken from whichever handle the delete commits on
+            files_before = snapshot_before = None
+
+            def delete_rows(table) -> None:
+                nonlocal files_before, snapshot_before
+                files_before = self._count_data_files(table)
+                snapshot_before = table.current_snapshot()
+                table.delete(combined_filter)
+
+            table = self._commit_with_retry(table_identifier, table, delete_rows)
 
             # Invalidate metadata + query caches so subsequent queries see the new snapshot
             cache_key = table_identifier
             if cache_key in self._metadata_cache:
                 del self._metadata_cache[cache_key]
             # Purge all cached query results for this table
-            stale_keys = [k for k in self._query_cache if request.table in k]
-            for k in stale_keys:
-                del self._query_cache[k]
+            self._invalidate_query_cache(table_identifier)
 
-            # Reload table to get updated file count
-            table = self._get_catalog().load_table(table_identifier)
-            files_after = len(list(table.scan().plan_files()))
+            # delete() refreshed the table in place - count files on the new snapshot
+            files_after = self._count_data_files(table)
+            records_to_delete = self._net_deleted_records(
+                table, snapshot_before.snapshot_id if snapshot_before else None
+            )
 
             # Update metadata cache with new snapshot path
-            self._metadata_cache[cache_key] = (table.metadata_location, time.time())
+            self._cache_metadata_path(cache_key, table.metadata_location, time.time(), self._cache_ttl)
 
             print(f"✓ Hard deleted {records_to_delete} records from {request.table}")
             print(f"  Files rewritten: {files_before - files_after}")
@@ -1478,7 +2134,7 @@ class FullIcebergOperations:
             )
 
 
-    def _build_iceberg_filter_from_array(self, filters: List) -> Any:
+    def _build_iceberg_filter_from_array(self, filters: Sequence) -> Any:
         """Convert filters array to PyIceberg filter expression (all ANDed)"""
         from pyiceberg.expressions import (
             EqualTo, NotEqualTo, GreaterThan, LessThan, 
@@ -1584,33 +2240,31 @@ class FullIcebergOperations:
             existing_records = []
             if request.filters:
                 # Build filter SQL using TypeSafeQueryBuilder
-                builder = TypeSafeQueryBuilder()
-                filter_sql, params = builder._build_filters(request.filters, "")
+                filter_sql, params = self._query_builder._build_filters(request.filters, "")
 
                 # Add tenant filter
                 if filter_sql:
-                    filter_sql = f"_tenant_id = '{request.tenant_id}' AND _deleted = false AND ({filter_sql})"
+                    filter_sql = f"_tenant_id = ? AND _deleted = false AND ({filter_sql})"
                 else:
-                    filter_sql = f"_tenant_id = '{request.tenant_id}' AND _deleted = false"
+                    filter_sql = "_tenant_id = ? AND _deleted = false"
 
-                # Execute query to find existing records
-                table_name = self._get_table_identifier(request.tenant_id, request.namespace, request.table)
+                # Execute query to find existing records - read at the cached
+                # handle's metadata, like update() and delete()
+                metadata_path = self._load_table_cached(table_identifier).metadata_location
                 query = f"""
                     SELECT *
-                    FROM {table_name}
+                    FROM iceberg_scan(?)
                     WHERE {filter_sql}
                 """
 
-                if params:
-                    result = self.conn.execute(query, params).fetchall()
-                else:
-                    result = self.conn.execute(query).fetchall()
-
-                # Convert to list of dicts and get latest versions
-                if result:
-                    columns = [desc[0] for desc in result.description]
-                    existing_records = [dict(zip(columns, row)) for row in result]
+                # Fetch as Arrow and build the row dicts in C - no Python tuples
+                # to zip against the cursor description
+                existing_records = _arrow_table(
+                    self.conn.execute(query, [metadata_path, request.tenant_id, *params])
+                ).to_pylist()
 
+                # Get latest versions
+                if existing_records:
                     # Group by _record_id and get latest version
                     latest_by_id = {}
                     for record in existing_records:
@@ -1624,11 +2278,23 @@ class FullIcebergOperations:
             print(f"  Found {len(existing_records)} existing records")
 
             # Prepare records to append
-            timestamp = datetime.utcnow()
+            timestamp = _utcnow()
             records_to_append = []
             records_inserted = 0
             records_updated = 0
 
+            # System fields shared by every row of this upsert, merged per record below
+            insert_fields = {
+                "_tenant_id": request.tenant_id,
+                "_timestamp": timestamp,
+                "_version": 1,
+                "_deleted": False,
+                "_deleted_at": None
+            }
+            delete_marker_fields = {"_timestamp": timestamp, "_deleted": True, "_deleted_at": timestamp}
+            new_version_fields = {"_timestamp": timestamp, "_deleted": False, "_deleted_at": None}
+            default_updates = request.updates or {}
+
             # Step 2: Process existing records (UPDATE path)
             if existing_records:
                 # Create a mapping for quick lookup
@@ -1653,68 +2319,44 @@ class FullIcebergOperations:
                         current_version = int(existing_record.get("_version", 1))
 
                         # 1. Create delete marker for old version
-                        delete_marker = existing_record.copy()
-                        delete_marker["_version"] = current_version + 1
-                        delete_marker["_timestamp"] = timestamp
-                        delete_marker["_deleted"] = True
-                        delete_marker["_deleted_at"] = timestamp
-                        records_to_append.append(delete_marker)
-
-                        # 2. Create new version with updates
-                        updated_record = existing_record.copy()
-                        updated_record["_version"] = current_version + 2
-                        updated_record["_timestamp"] = timestamp
-                        updated_record["_deleted"] = False
-                        updated_record["_deleted_at"] = None
-
-                        # Apply the new record data
-                        updated_record.update(new_record)
-
-                        # Apply any additional updates if provided
-                        if request.updates:
-                            updated_record.update(request.updates)
-
-                        records_to_append.append(updated_record)
+                        records_to_append.append({
+                            **existing_record,
+                            **delete_marker_fields,
+                            "_version": current_version + 1
+                        })
+
+                        # 2. Create new version with the new record data, then
+                        # any additional updates if provided
+                        records_to_append.append({
+                            **existing_record,
+                            **new_version_fields,
+                            "_version": current_version + 2,
+                            **new_record,
+                            **default_updates
+                        })
                         records_updated += 1
 
                         # Remove from map so we know what's left to insert
                         del existing_map[key_value]
                     else:
-                        # INSERT: New record
-                        insert_record = new_record.copy()
-                        insert_record.update({
-                            "_tenant_id": request.tenant_id,
+                        # INSERT: New record, then any default updates for new records
+                        records_to_append.append({
+                            **new_record,
+                            **insert_fields,
                             "_record_id": str(uuid.uuid4()),
-                            "_timestamp": timestamp,
-                            "_version": 1,
-                            "_deleted": False,
-                            "_deleted_at": None
+                            **default_updates
                         })
-
-                        # Apply any default updates for new records
-                        if request.updates:
-                            insert_record.update(request.updates)
-
-                        records_to_append.append(insert_record)
                         records_inserted += 1
             else:
                 # Step 3: All records are new (INSERT path)
                 for new_record in request.records:
-                    insert_record = new_record.copy()
-                    insert_record.update({
-                        "_tenant_id": request.tenant_id,
+                    # Apply any default updates for new records
+                    records_to_append.append({
+                        **new_record,
+                        **insert_fields,
                         "_record_id": str(uuid.uuid4()),
-                        "_timestamp": timestamp,
-                        "_version": 1,
-                        "_deleted": False,
-                        "_deleted_at": None
+                        **default_updates
                     })
-
-                    # Apply any default updates for new records
-                    if request.updates:
-                        insert_record.update(request.updates)
-
-                    records_to_append.append(insert_record)
                     records_inserted += 1
 
             # Step 4: Single atomic append of all records
@@ -1724,26 +2366,27 @@ class FullIcebergOperations:
                 arrow_table = pa.Table.from_pylist(records_to_append)
 
                 # Load table and ensure schema compliance
-                table = self._get_catalog().load_table(table_identifier)
-                iceberg_schema = table.schema().as_arrow()
+                table = self._load_table_cached(table_identifier)
+                iceberg_schema, field_names = self._get_arrow_schema(table_identifier, table)
 
                 # Reorder columns to match Iceberg schema
-                field_names = [field.name for field in iceberg_schema]
                 arrow_table = arrow_table.select(field_names)
 
                 # Cast to match schema exactly
                 arrow_table = arrow_table.cast(iceberg_schema)
 
-                # ATOMIC APPEND - both delete markers and new versions
-                table.append(arrow_table)
-
-                # Force commit by reloading table
-                table = self._get_catalog().load_table(table_identifier)
+                # ATOMIC APPEND - both delete markers and new versions (derived
+                # from the read above, so never re-applied)
+                self._commit_with_retry(
+                    table_identifier, table, lambda table: table.append(arrow_table),
+                    retry=False
+                )
 
-                # Invalidate cache for immediate consistency
+                # Invalidate metadata + query caches for immediate consistency
                 if table_identifier in self._metadata_cache:
                     del self._metadata_cache[table_identifier]
-                    print(f"✓ Invalidated cache for {table_identifier} after UPSERT")
+                self._invalidate_query_cache(table_identifier)
+                print(f"✓ Invalidated cache for {table_identifier} after UPSERT")
 
             print(f"✓ UPSERT completed: {records_inserted} inserted, {records_updated} updated")
 
@@ -1773,6 +2416,144 @@ class FullIcebergOperations:
                 )
             )
 
+    def _rewrite_data_files(self, table, scan_tasks: list, iceberg_schema) -> list:
+        """
+        Replace the given data files with bin-packed files in one overwrite snapshot
+
+        Every row of each file is carried over (all tenants and versions), so
+        the rewrite only changes file layout. Files not listed are untouched.
+        Files are rewritten in chunks of at most COMPACTION_CHUNK_BYTES (on disk)
+        per partition, so memory is bounded by the chunk, not the selection.
+
+        Returns:
+            The DataFiles written to replace them
+        """
+        from pyiceberg.expressions import AlwaysTrue
+        from pyiceberg.io.pyarrow import ArrowScan, _dataframe_to_data_files
+
+        if not scan_tasks:
+            return []
+
+        # Files from different partitions never share an output file, so each
+        # partition is rewritten on its own; one snapshot commits all
+        partition_groups = {}
+        for task in scan_tasks:
+            partition_groups.setdefault((task.file.spec_id, task.file.partition), []).append(task)
+
+        # Bin-pack each partition's files into size-bounded chunks
+        chunks = []
+        for tasks in partition_groups.values():
+            chunk, chunk_bytes = [], 0
+            for task in tasks:
+                if chunk and chunk_bytes + task.file.file_size_in_bytes > COMPACTION_CHUNK_BYTES:
+                    chunks.append(chunk)
+                    chunk, chunk_bytes = [], 0
+                chunk.append(task)
+                chunk_bytes += task.file.file_size_in_bytes
+            chunks.append(chunk)
+
+        with table.transaction() as tx:
+            with tx.update_snapshot().overwrite() as rewrite:
+                # Shared counter keeps file names unique across concurrent writers
+                file_counter = itertools.count(0)
+                # Cluster rows by tenant and record so the new files carry tight
+                # min/max stats for tenant pruning and versioned lookups
+                sort_keys = [
+                    (name, "ascending") for name in COMPACTION_SORT_COLUMNS
+                    if name in iceberg_schema.names
+                ]
+
+                def rewrite_chunk(tasks: list) -> list:
+                    rows = ArrowScan(
+                        table.metadata, table.io, table.schema(), AlwaysTrue()
+                    ).to_table(tasks).cast(iceberg_schema)
+                    if sort_keys:
+                        rows = rows.sort_by(sort_keys)
+                    return list(_dataframe_to_data_files(
+                        table_metadata=tx.table_metadata,
+                        write_uuid=rewrite.commit_uuid,
+                        df=rows,
+                        io=table.io,
+                        counter=file_counter
+                    ))
+
+                if len(chunks) == 1:
+                    rewritten = [rewrite_chunk(chunks[0])]
+                else:
+                    with ThreadPoolExecutor(max_workers=min(COMPACTION_WORKERS, len(chunks)),
+                                            thread_name_prefix="compaction") as pool:
+                        rewritten = list(pool.map(rewrite_chunk, chunks))
+
+                for task in scan_tasks:
+                    rewrite.delete_data_file(task.file)
+                added_files = [data_file for files in rewritten for data_file in files]
+                for data_file in added_files:
+                    rewrite.append_data_file(data_file)
+        return added_files
+
+    def _rewrite_tenant_data(self, table, request: CompactRequest, partition_filter,
+                             iceberg_schema, field_names) -> bool:
+        """
+        Rewrite all of a tenant's rows (optionally one partition scope) with overwrite()
+
+        Returns:
+            False if there was no data to rewrite
+        """
+        from pyiceberg.expressions import And, EqualTo
+
+        # Manifest stats settle an empty tenant without DuckDB opening any file
+        tenant_filter = EqualTo("_tenant_id", request.tenant_id)
+        if not any(True for _ in table.scan(row_filter=tenant_filter).plan_files()):
+            return False
+
+        # Read the tenant's data (we'll rewrite everything in scope to maintain
+        # consistency). Columns are selected in Iceberg schema order so DuckDB
+        # only decodes schema columns and the per-batch cast is cheap
+        column_list = ", ".join(f'"{name}"' for name in field_names)
+        sql = f"""
+            SELECT {column_list} FROM iceberg_scan(?)
+            WHERE _tenant_id = ?
+        """
+        params = [table.metadata_location, request.tenant_id]
+
+        # Scope the rewrite to the requested partitions when the same filter
+        # can drive both the DuckDB read and the Iceberg overwrite
+        overwrite_kwargs = {}
+        if partition_filter is not None and all(
+            f.operator in PARTITION_REWRITE_OPERATORS for f in request.partition_filters
+        ):
+            partition_sql, partition_params = self._query_builder._build_filters(
+                request.partition_filters, ""
+            )
+            sql += f" AND ({partition_sql})"
+            params.extend(partition_params)
+            overwrite_kwargs["overwrite_filter"] = And(tenant_filter, partition_filter)
+
+        # Stream record batches from DuckDB instead of materializing the table
+        result = self.conn.execute(sql, params)
+        reader = _arrow_reader(result, COMPACTION_BATCH_ROWS)
+
+        first_batch = next((batch for batch in reader if batch.num_rows), None)
+        if first_batch is None:
+            return False
+
+        pa = _get_pyarrow()
+        reader = pa.RecordBatchReader.from_batches(
+            reader.schema, itertools.chain([first_batch], reader)
+        ).cast(iceberg_schema)
+
+        # PyIceberg only streams into unpartitioned tables, and older releases
+        # only accept a materialized Table
+        if _overwrite_accepts_reader() and table.spec().is_unpartitioned():
+            compacted_data = reader
+        else:
+            compacted_data = reader.read_all()
+
+        # Use table.overwrite() to replace all data with compacted version
+        # This will delete old files and write new, optimally-sized files
+        table.overwrite(compacted_data, **overwrite_kwargs)
+        return True
+
     def compact(self, request: CompactRequest) -> CompactResponse:
         """
         Compact small files into larger files to improve query performance.
@@ -1780,7 +2561,7 @@ class FullIcebergOperations:
         This addresses the "small files problem" where many small writes create
         too many tiny files, degrading query performance.
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
             table_identifier = self._get_table_identifier(
@@ -1788,165 +2569,159 @@ class FullIcebergOperations:
             )
 
             # Load Iceberg table
-            table = self._get_catalog().load_table(table_identifier)
-
-            # Get compaction config using nested keys
-            compaction_config = self.config.get('iceberg', 'compaction')
-
-            # Get threshold from config or request
-            small_file_threshold_bytes = (
-                request.target_file_size_mb or
-                compaction_config.get('small_file_threshold_mb', 64)
-            ) * 1024 * 1024
-
-            max_files_per_compaction = (
-                request.max_files or
-                compaction_config.get('max_files_per_compaction', 100)
-            )
-
-            min_files_to_compact = compaction_config.get('min_files_to_compact', 10)
-
-            # Inspect files using scan().plan_files()
-            scan_tasks = list(table.scan().plan_files())
-
-            if not scan_tasks:
-                from src.models import CompactResponseData, ResponseMetadata
-                return CompactResponse(
-                    success=True,
-                    data=CompactResponseData(
-                        compacted=False,
-                        reason="No files to compact",
-                        stats=None
-                    ),
-                    metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                    error=None
+            table = self._load_table_cached(table_identifier)
+
+            # Resolve thresholds (request overrides over iceberg.compaction config)
+            policy = request.to_policy(self.config.get('iceberg', 'compaction'))
+            small_file_threshold_bytes = policy.small_file_threshold_bytes
+            max_files_per_compaction = policy.max_files
+            min_files_to_compact = policy.min_files
+
+            # Restrict file inspection to the requested partitions (compiled once per request)
+            partition_filter = request.compiled_partition_filter(self._build_iceberg_filter_from_array)
+            scan_kwargs = {"row_filter": partition_filter} if partition_filter is not None else {}
+
+            # Inspect files using scan().plan_files() in a single pass: totals, the
+            # small-file count, and at most max_files_per_compaction small tasks
+            scanned_files = 0
+            scanned_bytes = 0
+            small_files_count = 0
+            files_to_compact = []
+            for task in table.scan(**scan_kwargs).plan_files():
+                file_size = task.file.file_size_in_bytes
+                scanned_files += 1
+                scanned_bytes += file_size
+                if file_size < small_file_threshold_bytes:
+                    small_files_count += 1
+                    if len(files_to_compact) < max_files_per_compaction:
+                        files_to_compact.append(task)
+
+            if not scanned_files:
+                return CompactResponse.ok(
+                    compacted=False,
+                    reason="No files to compact",
+                    stats=None
                 )
 
-            # Calculate statistics before compaction
-            total_files_before = len(scan_tasks)
-            total_bytes_before = sum(task.file.file_size_in_bytes for task in scan_tasks)
-
-            # Identify small files
-            small_files = [
-                task for task in scan_tasks
-                if task.file.file_size_in_bytes < small_file_threshold_bytes
-            ]
+            # Calculate statistics before compaction - the snapshot summary already
+            # holds table-wide totals; partition-scoped runs sum their own files
+            summary = table.current_snapshot().summary
+            if (partition_filter is None and summary
+                    and summary.get('total-delete-files') in (None, '0')
+                    and 'total-data-files' in summary and 'total-files-size' in summary):
+                total_files_before = int(summary['total-data-files'])
+                total_bytes_before = int(summary['total-files-size'])
+            else:
+                total_files_before = scanned_files
+                total_bytes_before = scanned_bytes
 
             # Check if compaction is needed
-            if not request.force and len(small_files) < min_files_to_compact:
-                from src.models import CompactResponseData, ResponseMetadata
-                return CompactResponse(
-                    success=True,
-                    data=CompactResponseData(
-                        compacted=False,
-                        reason=f"Only {len(small_files)} small files (threshold: {min_files_to_compact})",
-                        stats=None
-                    ),
-                    metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                    error=None
+            if not policy.force and small_files_count < min_files_to_compact:
+                return CompactResponse.ok(
+                    compacted=False,
+                    reason=f"Only {small_files_count} small files (threshold: {min_files_to_compact})",
+                    stats=None
                 )
 
-            # Limit files to compact
-            files_to_compact = small_files[:max_files_per_compaction]
-
-            print(f"Compacting {len(files_to_compact)} small files out of {total_files_before} total files")
-
-            # Read all data from the table (we'll rewrite everything to maintain consistency)
-            metadata_path = table.metadata_location
-            sql = f"""
-                SELECT * FROM iceberg_scan('{metadata_path}')
-                WHERE _tenant_id = '{request.tenant_id}'
-            """
-
-            # Read data using DuckDB directly into PyArrow (no pandas)
-            arrow_table = self.conn.execute(sql).fetch_arrow_table()
-
-            if arrow_table.num_rows == 0:
-                from src.models import CompactResponseData, ResponseMetadata
-                return CompactResponse(
-                    success=True,
-                    data=CompactResponseData(
-                        compacted=False,
-                        reason="No data to compact",
-                        stats=None
-                    ),
-                    metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                    error=None
+            # Rewriting a single file cannot reduce the file count, even when forced;
+            # bail out before any data is read
+            if len(files_to_compact) < 2:
+                return CompactResponse.ok(
+                    compacted=False,
+                    reason=f"Nothing to merge: {len(files_to_compact)} small file(s) selected",
+                    stats=None
                 )
 
-            # Get Iceberg schema
-            iceberg_schema = table.schema().as_arrow()
-
-            # Reorder and cast to match Iceberg schema
-            field_names = [field.name for field in iceberg_schema]
-            arrow_table = arrow_table.select(field_names)
-            arrow_table = arrow_table.cast(iceberg_schema)
-
-            # Use table.overwrite() to replace all data with compacted version
-            # This will delete old files and write new, optimally-sized files
-            table.overwrite(arrow_table)
+            print(f"Compacting {len(files_to_compact)} small files out of {total_files_before} total files")
 
-            # Refresh table metadata
-            table = self._get_catalog().load_table(table_identifier)
+            iceberg_schema, field_names = self._get_arrow_schema(table_identifier, table)
+            try:
+                if _file_rewrite_supported():
+                    added_files = self._rewrite_data_files(table, files_to_compact, iceberg_schema)
+                else:
+                    # PyIceberg without (or with differently shaped) file-level write
+                    # helpers - they are private API: rewrite the tenant's data
+                    print("⚠ File-level rewrite unavailable, rewriting tenant data")
+                    added_files = None
+                    if not self._rewrite_tenant_data(table, request, partition_filter,
+                                                     iceberg_schema, field_names):
+                        return CompactResponse.ok(
+                            compacted=False,
+                            reason="No data to compact",
+                            stats=None
+                        )
+            except Exception:
+                self._table_cache.pop(table_identifier, None)
+                raise
+            self._cache_table(table_identifier, table)
+            # Any earlier small-file hint no longer applies
+            with self._compaction_hints_lock:
+                self._compaction_hints.pop(table_identifier, None)
             
             # Invalidate cache after compaction rewrite
             if table_identifier in self._metadata_cache:
                 del self._metadata_cache[table_identifier]
 
 
-            # Get new file statistics using scan().plan_files()
-            new_scan_tasks = list(table.scan().plan_files())
-            total_files_after = len(new_scan_tasks)
-            total_bytes_after = sum(task.file.file_size_in_bytes for task in new_scan_tasks)
-
-            # Count remaining small files
-            small_files_remaining = len([
-                task for task in new_scan_tasks
-                if task.file.file_size_in_bytes < small_file_threshold_bytes
-            ])
+            if added_files is not None:
+                # Only files_to_compact were replaced: derive the new file statistics
+                # from the pre-compaction scan and the files just written, instead
+                # of planning the scan again
+                total_files_after = total_files_before - len(files_to_compact) + len(added_files)
+                total_bytes_after = (
+                    total_bytes_before
+                    - sum(task.file.file_size_in_bytes for task in files_to_compact)
+                    + sum(data_file.file_size_in_bytes for data_file in added_files)
+                )
+                small_files_remaining = small_files_count - len(files_to_compact) + sum(
+                    1 for data_file in added_files
+                    if data_file.file_size_in_bytes < small_file_threshold_bytes
+                )
+            else:
+                # Get new file statistics (and remaining small files) in one
+                # pass over scan().plan_files()
+                total_files_after = 0
+                total_bytes_after = 0
+                small_files_remaining = 0
+                for task in table.scan(**scan_kwargs).plan_files():
+                    file_size = task.file.file_size_in_bytes
+                    total_files_after += 1
+                    total_bytes_after += file_size
+                    if file_size < small_file_threshold_bytes:
+                        small_files_remaining += 1
 
             # Expire old snapshots if requested
             # NOTE: This is the KEY to deleting old files!
             snapshots_expired = 0
             if request.expire_snapshots:
                 try:
-                    retention_time = datetime.utcnow() - timedelta(
-                        hours=request.snapshot_retention_hours
-                    )
-                    
-                    # Reload table to get latest metadata
-                    table = self._get_catalog().load_table(table_identifier)
-                    
-                    # Get all snapshots
-                    all_snapshots = list(table.history())
-                    print(f"Total snapshots in table: {len(all_snapshots)}")
-                    
-                    # Check retention - but for compaction, we want to delete immediately!
-                    # Set retention to NOW to expire old snapshots immediately after compaction
-                    older_than_ms = int(datetime.utcnow().timestamp() * 1000)
+                    # Get all snapshots (already in the loaded metadata)
+                    all_snapshots = table.metadata.snapshots
                     
-                    # Keep only the latest snapshot
+                    # Expire snapshots older than snapshot_retention_hours; newer ones
+                    # stay available for time-travel queries
+                    older_than_ms = request.retention_cutoff_ms
+
                     if len(all_snapshots) > 1:
-                        print(f"Expiring {len(all_snapshots) - 1} old snapshots...")
-                        
                         # Use table.expire_snapshots() with older_than parameter
                         # This is the correct PyIceberg 0.10.0 API
                         table.manage_snapshots().expire_snapshots().expire_older_than(older_than_ms).commit()
+                        self._cache_table(table_identifier, table)
                         
-                        snapshots_expired = len(all_snapshots) - 1
-                        print(f"✓ Expired {snapshots_expired} old snapshots and deleted orphan files")
-                    else:
-                        print("✓ Only 1 snapshot exists, no old files to delete")
-                        
+                        # Count what was actually removed (snapshots still referenced
+                        # by a branch or tag survive expiry)
+                        snapshots_expired = len(all_snapshots) - len(table.metadata.snapshots)
+
                 except AttributeError as e:
                     print(f"⚠ Snapshot expiration API not available: {e}")
                     print(f"⚠ Old files will remain for time-travel queries")
                 except Exception as e:
+                    self._table_cache.pop(table_identifier, None)
                     print(f"⚠ Could not expire snapshots: {e}")
                     print(f"⚠ Old files will remain on S3 until manual cleanup")
 
             # Calculate compaction time
-            compaction_time_ms = (time.time() - start_time) * 1000
+            compaction_time_ms = (time.perf_counter() - start_time) * 1000
 
             # Build response
             stats = CompactionStats(
@@ -1958,29 +2733,23 @@ class FullIcebergOperations:
                 bytes_after=total_bytes_after,
                 bytes_saved=total_bytes_before - total_bytes_after,
                 snapshots_expired=snapshots_expired,
-                compaction_time_ms=compaction_time_ms,
+                compaction_time_ms=int(compaction_time_ms),
                 small_files_remaining=small_files_remaining
             )
 
-            print(f"✓ Compaction complete: {total_files_before} → {total_files_after} files")
-            print(f"  Small files: {len(small_files)} → {small_files_remaining}")
-            print(f"  Size: {total_bytes_before / (1024*1024):.1f}MB → {total_bytes_after / (1024*1024):.1f}MB")
-            print(f"  Time: {compaction_time_ms:.0f}ms")
+            # One JSON line per compaction (CloudWatch Insights can parse the fields)
+            print("✓ Compaction complete " + orjson.dumps(
+                {"table": table_identifier, "small_files_before": small_files_count, **asdict(stats)}
+            ).decode())
 
-            from src.models import CompactResponseData, ResponseMetadata
-            return CompactResponse(
-                success=True,
-                data=CompactResponseData(
-                    compacted=True,
-                    reason=None,
-                    stats=stats
-                ),
-                metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                error=None
+            return CompactResponse.ok(
+                compacted=True,
+                reason=None,
+                stats=stats
             )
 
         except Exception as e:
-            compaction_time_ms = (time.time() - start_time) * 1000
+            compaction_time_ms = (time.perf_counter() - start_time) * 1000
             print(f"✗ Compaction failed after {compaction_time_ms:.0f}ms: {e}")
             from src.models import ResponseMetadata
             return CompactResponse(
@@ -2001,13 +2770,7 @@ class FullIcebergOperations:
             # Extract table names
             table_names = [table[1] for table in tables]  # tables are (namespace, name) tuples
 
-            from src.models import ListTablesResponseData, ResponseMetadata
-            return ListTablesResponse(
-                success=True,
-                data=ListTablesResponseData(tables=table_names),
-                metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                error=None
-            )
+            return ListTablesResponse.ok(tables=table_names)
 
         except Exception as e:
             from src.models import ResponseMetadata
@@ -2026,7 +2789,7 @@ class FullIcebergOperations:
             )
 
             # Load table
-            table = self._get_catalog().load_table(table_identifier)
+            table = self._load_table_cached(table_identifier)
 
             # Get schema info
             schema_fields = {}
@@ -2034,31 +2797,31 @@ class FullIcebergOperations:
                 if not field.name.startswith('_'):  # Skip system fields
                     schema_fields[field.name] = str(field.field_type)
 
-            # Get row count using DuckDB with metadata file
-            metadata_path = table.metadata_location
-            sql = f"""
-                SELECT COUNT(*) as row_count
-                FROM iceberg_scan('{metadata_path}')
-                WHERE _deleted IS NOT TRUE
-                AND _tenant_id = '{request.tenant_id}'
-            """
-            result = self.conn.execute(sql).fetchone()
-            row_count = result[0] if result else 0
+            # Get row count from manifest stats, scanning only files they can't settle
+            try:
+                row_count = self._count_live_rows(table, request.tenant_id)
+            except Exception as e:
+                print(f"⚠ Metadata row count unavailable, using iceberg_scan: {e}")
+                row_count = None
+
+            if row_count is None:
+                sql = """
+                    SELECT COUNT(*) as row_count
+                    FROM iceberg_scan(?)
+                    WHERE _deleted IS NOT TRUE
+                    AND _tenant_id = ?
+                """
+                result = self.conn.execute(sql, [table.metadata_location, request.tenant_id]).fetchone()
+                row_count = result[0] if result else 0
 
             table_desc = TableDescription(
                 table_name=request.table,
                 namespace=request.namespace,
                 row_count=row_count,
-                schema={"fields": schema_fields}
+                table_schema={"fields": schema_fields}
             )
 
-            from src.models import DescribeTableResponseData, ResponseMetadata
-            return DescribeTableResponse(
-                success=True,
-                data=DescribeTableResponseData(table=table_desc),
-                metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                error=None
-            )
+            return DescribeTableResponse.ok(table=table_desc)
 
         except Exception as e:
             from src.models import ResponseMetadata
@@ -2076,19 +2839,15 @@ class FullIcebergOperations:
                 request.tenant_id, request.namespace, request.table
             )
             
-            # Check if exists first
+            # Check if exists first (REST catalogs answer with a HEAD request)
             try:
-                self._get_catalog().load_table(table_identifier)
-            except:
-                from src.models import DropTableResponseData, ResponseMetadata
-                return DropTableResponse(
-                    success=True,
-                    data=DropTableResponseData(
-                        table_dropped=False,
-                        table_existed=False
-                    ),
-                    metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                    error=None
+                table_exists = self._get_catalog().table_exists(table_identifier)
+            except Exception:
+                table_exists = False
+            if not table_exists:
+                return DropTableResponse.ok(
+                    table_dropped=False,
+                    table_existed=False
                 )
 
             # Drop table
@@ -2108,18 +2867,16 @@ class FullIcebergOperations:
             # Invalidate cache
             if table_identifier in self._metadata_cache:
                 del self._metadata_cache[table_identifier]
+            self._table_cache.pop(table_identifier, None)
+            self._arrow_schema_cache.pop(table_identifier, None)
+            with self._compaction_hints_lock:
+                self._compaction_hints.pop(table_identifier, None)
 
             print(f"✓ Dropped table: {table_identifier} (purge={request.purge})")
             
-            from src.models import DropTableResponseData, ResponseMetadata
-            return DropTableResponse(
-                success=True,
-                data=DropTableResponseData(
-                    table_dropped=True,
-                    table_existed=True
-                ),
-                metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                error=None
+            return DropTableResponse.ok(
+                table_dropped=True,
+                table_existed=True
             )
 
         except Exception as e:
@@ -2142,29 +2899,17 @@ class FullIcebergOperations:
             
             print(f"✓ Dropped namespace: {namespace}")
             
-            from src.models import DropNamespaceResponseData, ResponseMetadata
-            return DropNamespaceResponse(
-                success=True,
-                data=DropNamespaceResponseData(
-                    namespace_dropped=True,
-                    namespace_existed=True
-                ),
-                metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                error=None
+            return DropNamespaceResponse.ok(
+                namespace_dropped=True,
+                namespace_existed=True
             )
 
         except Exception as e:
             # Check if it's because it doesn't exist
             if "not found" in str(e).lower() or "does not exist" in str(e).lower():
-                from src.models import DropNamespaceResponseData, ResponseMetadata
-                return DropNamespaceResponse(
-                    success=True,
-                    data=DropNamespaceResponseData(
-                        namespace_dropped=False,
-                        namespace_existed=False
-                    ),
-                    metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
-                    error=None
+                return DropNamespaceResponse.ok(
+                    namespace_dropped=False,
+                    namespace_existed=False
                 )
                 
             from src.models import ResponseMetadata
@@ -2182,7 +2927,7 @@ class FullIcebergOperations:
         """
         try:
             print(f"Starting CSV export for {request.table} (tenant={request.tenant_id})")
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             table_identifier = self._get_table_identifier(
                 request.tenant_id, request.namespace, request.table
@@ -2206,11 +2951,10 @@ class FullIcebergOperations:
                 select_clause = ", ".join(request.projection)
 
             # Build WHERE clause
-            builder = TypeSafeQueryBuilder()
-            filter_sql, params = builder._build_filters(request.filters, "")
+            filter_sql, params = self._query_builder._build_filters(request.filters, "")
             
             # Base filters (tenant + deleted)
-            base_filters = [f"_tenant_id = '{request.tenant_id}'"]
+            base_filters = ["_tenant_id = ?"]
             if not request.include_deleted:
                 base_filters.append("_deleted IS NOT TRUE")
             
@@ -2222,9 +2966,10 @@ class FullIcebergOperations:
             # Build base query
             sql = f"""
                 SELECT {select_clause}
-                FROM iceberg_scan('{metadata_path}')
+                FROM iceberg_scan(?)
                 WHERE {where_clause}
             """
+            params = [metadata_path, request.tenant_id, *params]
 
             # Add sorting
             if request.sort:
@@ -2239,7 +2984,7 @@ class FullIcebergOperations:
 
             # Generate export location
             export_id = str(uuid.uuid4())
-            timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+            timestamp = _utcnow().strftime('%Y%m%d_%H%M%S')
             filename = request.filename or f"{request.table}_{timestamp}.csv"
             if not filename.endswith('.csv'):
                 filename += '.csv'
@@ -2257,11 +3002,9 @@ class FullIcebergOperations:
                 COPY ({sql}) TO '{s3_uri}' (FORMAT CSV, HEADER {str(request.include_header).upper()});
             """
             
-            # Execute
-            if params:
-                self.conn.execute(copy_sql, params)
-            else:
-                self.conn.execute(copy_sql)
+            # Execute - COPY reports the number of rows it wrote, so the CSV
+            # encoding and the row count both stay inside DuckDB
+            row_count = self.conn.execute(copy_sql, params).fetchone()[0]
             
             # Get file size and row count
             # Use boto3 to get object metadata
@@ -2285,39 +3028,17 @@ class FullIcebergOperations:
             except Exception as e:
                 raise RuntimeError(f"Failed to generate download URL: {e}")
 
-            # Calculate row count (approximate or execute count query if needed)
-            # For now, we'll run a quick count query if not limited
-            # Optimization: If we used LIMIT, use that as upper bound
-            row_count = 0
-            if request.limit and request.limit < 1000:
-                 # Small limit, just set it
-                 row_count = request.limit 
-            else:
-                # Count query
-                count_sql = f"SELECT COUNT(*) FROM iceberg_scan('{metadata_path}') WHERE {where_clause}"
-                if params:
-                    row_count = self.conn.execute(count_sql, params).fetchone()[0]
-                else:
-                    row_count = self.conn.execute(count_sql).fetchone()[0]
-                
-                if request.limit and row_count > request.limit:
-                    row_count = request.limit
-
-            execution_time = (time.time() - start_time) * 1000
+            execution_time = (time.perf_counter() - start_time) * 1000
             print(f"✓ Export complete: {row_count} rows, {size_bytes} bytes in {execution_time:.0f}ms")
 
-            from src.models import ExportCsvResponseData, ResponseMetadata
-            return ExportCsvResponse(
-                success=True,
-                data=ExportCsvResponseData(
-                    download_url=presigned_url,
-                    rows_exported=row_count,
-                    file_size_bytes=size_bytes,
-                    filename=filename,
-                    expiration_seconds=request.expiration_seconds
-                ),
-                metadata=ResponseMetadata(request_id="temp", execution_time_ms=execution_time),
-                error=None
+            from src.models import ResponseMetadata
+            return ExportCsvResponse.ok(
+                download_url=presigned_url,
+                rows_exported=row_count,
+                file_size_bytes=size_bytes,
+                filename=filename,
+                expiration_seconds=request.expiration_seconds,
+                metadata=ResponseMetadata(request_id="temp", execution_time_ms=execution_time)
             )
 
         except Exception as e:
@@ -2344,37 +3065,15 @@ class FullIcebergOperations:
 
         # Get Iceberg types (lazy loaded)
         types = _get_pyiceberg_types()
-        StringType = types['StringType']
-        IntegerType = types['IntegerType']
-        LongType = types['LongType']
-        FloatType = types['FloatType']
-        DoubleType = types['DoubleType']
-        BooleanType = types['BooleanType']
-        DateType = types['DateType']
-        TimestampType = types['TimestampType']
-        DecimalType = types['DecimalType']
-        BinaryType = types['BinaryType']
         ListType = types['ListType']
         MapType = types['MapType']
         StructType = types['StructType']
         NestedField = types['NestedField']
+        primitive_types = _get_primitive_type_mapping()
 
         # Handle simple string type definition (backward compatibility)
         if isinstance(field_def, str):
-            field_type = field_def.lower()
-            type_mapping = {
-                'string': StringType(),
-                'integer': IntegerType(),
-                'long': LongType(),
-                'float': FloatType(),
-                'double': DoubleType(),
-                'boolean': BooleanType(),
-                'date': DateType(),
-                'timestamp': TimestampType(),
-                'decimal': DecimalType(38, 9),  # Default precision and scale
-                'binary': BinaryType(),
-            }
-            return type_mapping.get(field_type, StringType())
+            return primitive_types.get(field_def.lower(), primitive_types['string'])
         
         # Handle FieldDefinition object (complex types)
         if isinstance(field_def, FieldDefinition):
@@ -2421,22 +3120,10 @@ class FullIcebergOperations:
             
             # Handle primitive types
             else:
-                type_mapping = {
-                    'string': StringType(),
-                    'integer': IntegerType(),
-                    'long': LongType(),
-                    'float': FloatType(),
-                    'double': DoubleType(),
-                    'boolean': BooleanType(),
-                    'date': DateType(),
-                    'timestamp': TimestampType(),
-                    'decimal': DecimalType(38, 9),
-                    'binary': BinaryType(),
-                }
-                return type_mapping.get(field_type, StringType())
+                return primitive_types.get(field_type, primitive_types['string'])
         
         # Fallback to string type
-        return StringType()
+        return primitive_types['string']
 
 
 # Global instance
@@ -2467,6 +3154,8 @@ def get_iceberg_ops() -> FullIcebergOperations:
         try:
             print("Initializing Iceberg operations...")
             _iceberg_ops = FullIcebergOperations()
+            # Drain pending housekeeping (compaction probes) when the process exits
+            atexit.register(_iceberg_ops.close)
             print("✓ Iceberg operations initialized successfully")
         except Exception as e:
             _iceberg_ops_init_failed = True
@@ -2487,6 +3176,10 @@ class DatabaseOperations:
     def write(request: WriteRequest) -> WriteResponse:
         return get_iceberg_ops().write(request)
 
+    @staticmethod
+    def write_batch(request: WriteBatchRequest) -> WriteBatchResponse:
+        return get_iceberg_ops().write_batch(request)
+
     @staticmethod
     def query(request: QueryRequest) -> QueryResponse:
         return get_iceberg_ops().query(request)
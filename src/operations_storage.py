@@ -1,15 +1,17 @@
 
 import boto3
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 import mimetypes
-from datetime import datetime
+from datetime import datetime, timezone
 from botocore.exceptions import ClientError
 from typing import Optional
 
 from src.config import get_config
 from src.models import (
     GetUploadUrlRequest, GetUploadUrlResponse, GetUploadUrlResponseData,
-    GetDownloadUrlRequest, GetDownloadUrlResponse, GetDownloadUrlResponseData,
+    GetUploadUrlsBatchRequest, GetUploadUrlsBatchResponse,
+    GetDownloadUrlRequest, GetDownloadUrlResponse,
     ResponseMetadata, ErrorDetail
 )
 
@@ -33,6 +35,34 @@ class StorageOperations:
             endpoint_url=s3_config.get('endpoint')
         )
 
+    @staticmethod
+    def _sign_upload(s3_client, bucket_name: str, tenant_id: str, file) -> GetUploadUrlResponseData:
+        """Build the object key for one file and presign a PUT for it"""
+        # Professional path structure: 
+        # tenants/{tenant_id}/{folder}/{year}/{month}/{uuid}/{filename}
+        folder = file.folder or 'uploads'
+        file_uuid = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        
+        key = f"tenants/{tenant_id}/{folder}/{now.year}/{now.month:02d}/{file_uuid}/{file.filename}"
+        
+        # Generate URL
+        url = s3_client.generate_presigned_url(
+            ClientMethod='put_object',
+            Params={
+                'Bucket': bucket_name,
+                'Key': key,
+                'ContentType': file.content_type
+            },
+            ExpiresIn=file.expires_in
+        )
+        
+        return GetUploadUrlResponseData.model_construct(
+            upload_url=url,
+            file_key=key,
+            expires_in=file.expires_in
+        )
+
     @staticmethod
     def get_upload_url(request: GetUploadUrlRequest) -> GetUploadUrlResponse:
         """Generate presigned PUT URL"""
@@ -41,40 +71,40 @@ class StorageOperations:
             s3_client = StorageOperations._get_s3_client()
             bucket_name = config.s3.get('upload_bucket_name', config.s3['bucket_name'])
             
-            # Professional path structure: 
-            # tenants/{tenant_id}/{folder}/{year}/{month}/{uuid}/{filename}
-            folder = request.folder or 'uploads'
-            file_uuid = str(uuid.uuid4())
-            now = datetime.utcnow()
-            
-            key = f"tenants/{request.tenant_id}/{folder}/{now.year}/{now.month:02d}/{file_uuid}/{request.filename}"
-            
-            # Generate URL
-            url = s3_client.generate_presigned_url(
-                ClientMethod='put_object',
-                Params={
-                    'Bucket': bucket_name,
-                    'Key': key,
-                    'ContentType': request.content_type
-                },
-                ExpiresIn=request.expires_in
+            item = StorageOperations._sign_upload(s3_client, bucket_name, request.tenant_id, request)
+            return GetUploadUrlResponse.ok(
+                upload_url=item.upload_url,
+                file_key=item.file_key,
+                expires_in=item.expires_in
             )
             
+        except Exception as e:
             return GetUploadUrlResponse(
-                success=True,
-                data=GetUploadUrlResponseData(
-                    upload_url=url,
-                    file_key=key,
-                    expires_in=request.expires_in
-                ),
-                metadata=ResponseMetadata(
-                    request_id="temp", 
-                    execution_time_ms=0
-                )
+                success=False,
+                metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
+                error=ErrorDetail(code="STORAGE_ERROR", message=str(e))
             )
-            
+
+    @staticmethod
+    def get_upload_urls_batch(request: GetUploadUrlsBatchRequest) -> GetUploadUrlsBatchResponse:
+        """Generate presigned PUT URLs for several files with one client"""
+        try:
+            config = get_config()
+            s3_client = StorageOperations._get_s3_client()
+            bucket_name = config.s3.get('upload_bucket_name', config.s3['bucket_name'])
+
+            # Signing is local (no S3 round-trip) but credential refresh can block;
+            # the shared client is thread-safe, so fan out and keep request order
+            def sign(file):
+                return StorageOperations._sign_upload(s3_client, bucket_name, request.tenant_id, file)
+
+            with ThreadPoolExecutor(max_workers=min(16, len(request.files))) as pool:
+                items = list(pool.map(sign, request.files))
+
+            return GetUploadUrlsBatchResponse.ok(items=items)
+
         except Exception as e:
-            return GetUploadUrlResponse(
+            return GetUploadUrlsBatchResponse(
                 success=False,
                 metadata=ResponseMetadata(request_id="temp", execution_time_ms=0),
                 error=ErrorDetail(code="STORAGE_ERROR", message=str(e))
@@ -118,16 +148,9 @@ class StorageOperations:
                 ExpiresIn=request.expires_in
             )
 
-            return GetDownloadUrlResponse(
-                success=True,
-                data=GetDownloadUrlResponseData(
-                    download_url=url,
-                    expires_in=request.expires_in
-                ),
-                metadata=ResponseMetadata(
-                    request_id="temp",
-                    execution_time_ms=0
-                )
+            return GetDownloadUrlResponse.ok(
+                download_url=url,
+                expires_in=request.expires_in
             )
 
         except Exception as e:
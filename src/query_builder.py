@@ -5,7 +5,8 @@ This builder translates type-safe query models into parameterized SQL,
 preventing SQL injection while maintaining clean, readable code.
 """
 
-from typing import Any, Dict, List, Optional, Tuple, Union
+import functools
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from datetime import datetime
 from decimal import Decimal
 
@@ -23,6 +24,45 @@ from .models import (
 )
 
 
+# Filter operator -> SQL operator
+FILTER_SQL_OPERATORS = {
+    'eq': '=',
+    'ne': '!=',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+    'in': 'IN',
+    'like': 'LIKE'
+}
+
+
+def _filter_condition_sql(field: str, operator: str, value_count: Optional[int], param_style: str) -> str:
+    """SQL for one filter condition; value_count is the IN-list length (None otherwise)"""
+    sql_operator = FILTER_SQL_OPERATORS.get(operator)
+    if not sql_operator:
+        raise ValueError(f"Unsupported operator: {operator}")
+
+    if operator == 'in':
+        placeholders = ', '.join([param_style] * value_count)
+        return f"{field} IN ({placeholders})"
+    return f"{field} {sql_operator} {param_style}"
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_filter_shape(shape: Tuple[Tuple[str, str, Optional[int]], ...], param_style: str) -> str:
+    """
+    ANDed SQL for a filter shape - (field, operator, IN-list length) per filter.
+
+    Values are never part of the shape, so repeated queries that differ only
+    in their filter values reuse the same compiled fragment.
+    """
+    return " AND ".join(
+        _filter_condition_sql(field, operator, value_count, param_style)
+        for field, operator, value_count in shape
+    )
+
+
 class TypeSafeQueryBuilder:
     """
     Builds parameterized SQL from type-safe query models.
@@ -205,8 +245,7 @@ class TypeSafeQueryBuilder:
             expr = f"TRIM({expr})"
 
         if field.substring:
-            start, length = field.substring
-            expr = f"SUBSTRING({expr}, {start}, {length})"
+            expr = f"SUBSTRING({expr}, {field.substring.start}, {field.substring.length})"
 
         # Date transformations
         if field.date_trunc:
@@ -261,29 +300,31 @@ class TypeSafeQueryBuilder:
 
     def _build_filters(
         self,
-        filters: List[Filter],
+        filters: Sequence[Filter],
         clause_type: str = "WHERE"
     ) -> Tuple[str, List[Any]]:
         """Build WHERE or HAVING clause from filters array (all ANDed)"""
         if not filters:
             return "", []
 
-        conditions = []
+        shape = []
         params = []
 
         for filter_item in filters:
-            condition_sql, condition_params = self._build_single_filter(filter_item)
-            if condition_sql:
-                conditions.append(condition_sql)
-                params.extend(condition_params)
-
-        if conditions:
-            sql = " AND ".join(conditions)
-            if clause_type:
-                return f"{clause_type} {sql}", params
+            value = filter_item.value
+            if filter_item.operator == 'in':
+                if not isinstance(value, list):
+                    raise ValueError(f"IN operator requires a list value, got {type(value)}")
+                shape.append((filter_item.field, filter_item.operator, len(value)))
+                params.extend(value)
             else:
-                return sql, params
-        return "", []
+                shape.append((filter_item.field, filter_item.operator, None))
+                params.append(value)
+
+        sql = _compile_filter_shape(tuple(shape), self.param_style)
+        if clause_type:
+            return f"{clause_type} {sql}", params
+        return sql, params
 
     def _build_single_filter(self, filter_item: Filter) -> Tuple[str, List[Any]]:
         """Build SQL for a single filter condition"""
@@ -291,36 +332,14 @@ class TypeSafeQueryBuilder:
         operator = filter_item.operator
         value = filter_item.value
 
-        # Map operators to SQL
-        operator_map = {
-            'eq': '=',
-            'ne': '!=',
-            'gt': '>',
-            'gte': '>=',
-            'lt': '<',
-            'lte': '<=',
-            'in': 'IN',
-            'like': 'LIKE'
-        }
-
-        sql_operator = operator_map.get(operator)
-        if not sql_operator:
-            raise ValueError(f"Unsupported operator: {operator}")
-
         # Handle IN operator
         if operator == 'in':
             if not isinstance(value, list):
                 raise ValueError(f"IN operator requires a list value, got {type(value)}")
-            placeholders = ', '.join([self.param_style] * len(value))
-            return f"{field} IN ({placeholders})", value
+            return _filter_condition_sql(field, operator, len(value), self.param_style), value
 
-        # Handle LIKE operator
-        elif operator == 'like':
-            return f"{field} LIKE {self.param_style}", [value]
-
-        # Handle standard comparison operators
-        else:
-            return f"{field} {sql_operator} {self.param_style}", [value]
+        # Handle LIKE and standard comparison operators
+        return _filter_condition_sql(field, operator, None, self.param_style), [value]
 
     # DEPRECATED - Keep for backwards compatibility but not used
     def _parse_filter_expression(self, expr: Union[Dict, Any]) -> Tuple[str, List[Any]]:
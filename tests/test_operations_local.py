@@ -0,0 +1,592 @@
+"""
+Behavioural tests for FullIcebergOperations against a local Iceberg catalog
+
+Tables live in a temporary warehouse directory and data is read back through
+PyIceberg, so these tests check results rather than generated SQL.
+"""
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import duckdb
+import pyarrow as pa
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyiceberg.catalog import MetastoreCatalog
+from pyiceberg.exceptions import CommitFailedException, NoSuchTableError
+from pyiceberg.io import load_file_io
+from pyiceberg.partitioning import UNPARTITIONED_PARTITION_SPEC
+from pyiceberg.serializers import FromInputFile
+from pyiceberg.table import CommitTableResponse, Table
+from pyiceberg.table.sorting import UNSORTED_SORT_ORDER
+
+from src.models import (
+    CompactRequest, CreateTableRequest, HardDeleteRequest, QueryRequest,
+    WriteBatchRequest, WriteRequest
+)
+
+
+class LocalCatalog(MetastoreCatalog):
+    """Minimal file-backed catalog: metadata files in a warehouse dir, pointers in a dict"""
+
+    def __init__(self, warehouse: str):
+        super().__init__("local", warehouse=warehouse)
+        self._locations = {}
+
+    def create_table(self, identifier, schema, location=None, partition_spec=None,
+                     sort_order=None, properties=None):
+        staged = self._create_staged_table(
+            identifier, schema, location,
+            partition_spec or UNPARTITIONED_PARTITION_SPEC,
+            sort_order or UNSORTED_SORT_ORDER,
+            properties or {}
+        )
+        self._write_metadata(staged.metadata, staged.io, staged.metadata_location)
+        self._locations[identifier] = staged.metadata_location
+        return self.load_table(identifier)
+
+    def load_table(self, identifier):
+        if isinstance(identifier, tuple):
+            identifier = ".".join(identifier)
+        if identifier not in self._locations:
+            raise NoSuchTableError(identifier)
+        location = self._locations[identifier]
+        io = load_file_io(self.properties, location)
+        return Table(
+            identifier=tuple(identifier.split(".")),
+            metadata=FromInputFile.table_metadata(io.new_input(location)),
+            metadata_location=location,
+            io=io,
+            catalog=self
+        )
+
+    def commit_table(self, table, requirements, updates):
+        identifier = ".".join(table.name())
+        staged = self._update_and_stage_table(
+            self.load_table(identifier), table.name(), requirements, updates
+        )
+        self._write_metadata(staged.metadata, staged.io, staged.metadata_location)
+        self._locations[identifier] = staged.metadata_location
+        return CommitTableResponse(
+            metadata=staged.metadata, metadata_location=staged.metadata_location
+        )
+
+    def _resolve_table_location(self, location, database_name, table_name):
+        return location or f"{self.properties['warehouse']}/{database_name}/{table_name}"
+
+    def _unsupported(self, *args, **kwargs):
+        raise NotImplementedError
+
+    create_namespace = drop_namespace = list_namespaces = list_tables = _unsupported
+    drop_table = rename_table = register_table = table_exists = _unsupported
+    load_namespace_properties = update_namespace_properties = namespace_exists = _unsupported
+    list_views = load_view = register_view = drop_view = view_exists = _unsupported
+
+
+class LocalIcebergTestCase(unittest.TestCase):
+    """FullIcebergOperations wired to a LocalCatalog and an in-memory DuckDB"""
+
+    TENANT = "acme"
+
+    def setUp(self):
+        self.warehouse = tempfile.mkdtemp()
+        config = MagicMock()
+        config.get.side_effect = lambda *keys: {
+            ('iceberg', 'compaction'): {'enabled': True, 'opportunistic_check_interval': 100}
+        }.get(keys)
+
+        with patch('src.operations_full_iceberg.get_config', return_value=config), \
+                patch('src.operations_full_iceberg.FullIcebergOperations._init_duckdb',
+                      side_effect=lambda: duckdb.connect()):
+            from src.operations_full_iceberg import FullIcebergOperations
+            self.ops = FullIcebergOperations()
+        self.ops.catalog = LocalCatalog(self.warehouse)
+        # S3 Select would reach out to AWS
+        self.ops._try_s3_select = lambda request, metadata_path: None
+
+    def tearDown(self):
+        self.ops.close()
+        shutil.rmtree(self.warehouse, ignore_errors=True)
+
+    def create_table(self, table="users", fields=None):
+        response = self.ops.create_table(CreateTableRequest(
+            tenant_id=self.TENANT,
+            table=table,
+            schema={"fields": fields or {"name": {"type": "string"}, "age": {"type": "integer"}}}
+        ))
+        self.assertTrue(response.success, response.error)
+        return self.ops._get_table_identifier(self.TENANT, "default", table)
+
+    def write(self, records, table="users"):
+        response = self.ops.write(WriteRequest(tenant_id=self.TENANT, table=table, records=records))
+        self.assertTrue(response.success, response.error)
+
+    def append_version(self, table_identifier, record, version, deleted=False, **changes):
+        """Append a later version of a written record (update/delete without iceberg_scan)"""
+        table = self.ops._load_table_cached(table_identifier)
+        iceberg_schema, _ = self.ops._get_arrow_schema(table_identifier, table)
+        record_id = self.ops._build_write_table([record], self.TENANT, iceberg_schema) \
+            .column("_record_id")[0].as_py()
+        rows = self.ops._build_write_table([{**record, **changes}], self.TENANT, iceberg_schema)
+        for name, value in (("_record_id", record_id), ("_version", version), ("_deleted", deleted)):
+            index = iceberg_schema.get_field_index(name)
+            field = iceberg_schema.field(index)
+            rows = rows.set_column(index, field, pa.array([value], type=field.type))
+        table.append(rows)
+        self.ops._cache_table(table_identifier, table)
+        return rows.column("_record_id")[0].as_py()
+
+    def stored_rows(self, table_identifier):
+        """Every physical row, read straight from the catalog"""
+        table = self.ops._get_catalog().load_table(table_identifier)
+        return table.scan().to_arrow().to_pylist()
+
+
+class TestWrite(LocalIcebergTestCase):
+
+    def test_record_ids_are_content_addressed(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}, {"age": 40, "name": "bob"}])
+        self.ops.write_batch(WriteBatchRequest(tenant_id=self.TENANT, writes=[
+            {"table": "users", "records": [{"age": 30, "name": "alice"}, {"name": "carol", "age": 50}]}
+        ]))
+
+        ids = {}
+        for row in self.stored_rows(table_identifier):
+            ids.setdefault(row["name"], set()).add(row["_record_id"])
+
+        # Same fields in any key order -> same id, whichever write path stored it
+        self.assertEqual(len(ids["alice"]), 1)
+        self.assertEqual(len(set.union(*ids.values())), 3)
+        self.assertEqual(ids["alice"], {hashlib.md5(b'{"age": 30, "name": "alice"}').hexdigest()})
+
+    def test_payloads_are_coerced_to_the_table_schema(self):
+        table_identifier = self.create_table(fields={
+            "name": {"type": "string"},
+            "age": {"type": "integer"},
+            "seen_at": {"type": "timestamp"},
+        })
+
+        self.write([{"name": "alice", "seen_at": "2024-03-01T12:30:00"}])
+        self.write([{"name": "bob", "age": 40, "seen_at": "2024-03-01T12:30:00+02:00"}])
+
+        rows = {row["name"]: row for row in self.stored_rows(table_identifier)}
+        self.assertEqual(rows["alice"]["seen_at"], datetime(2024, 3, 1, 12, 30))
+        self.assertIsNone(rows["alice"]["age"])
+        # Zone-suffixed strings are stored as the UTC instant
+        self.assertEqual(rows["bob"]["seen_at"], datetime(2024, 3, 1, 10, 30))
+        self.assertEqual(rows["bob"]["age"], 40)
+        self.assertEqual({row["_version"] for row in rows.values()}, {1})
+        self.assertEqual({row["_deleted"] for row in rows.values()}, {False})
+
+
+class TestWriteBatch(LocalIcebergTestCase):
+
+    def write_batch(self, writes):
+        return self.ops.write_batch(WriteBatchRequest(tenant_id=self.TENANT, writes=writes))
+
+    def test_writes_to_one_table_share_a_commit(self):
+        table_identifier = self.create_table()
+        snapshots_before = len(self.ops._load_table_cached(table_identifier).metadata.snapshots)
+
+        response = self.write_batch([
+            {"table": "users", "records": [{"name": "alice", "age": 30}]},
+            {"table": "users", "records": [{"name": "bob", "age": 40}, {"name": "carol", "age": 50}]},
+        ])
+
+        self.assertTrue(response.success, response.error)
+        self.assertEqual([item.data.records_written for item in response.data.items], [1, 2])
+        table = self.ops._get_catalog().load_table(table_identifier)
+        self.assertEqual(len(table.metadata.snapshots), snapshots_before + 1)
+        self.assertEqual(sorted(row["name"] for row in self.stored_rows(table_identifier)),
+                         ["alice", "bob", "carol"])
+
+    def test_invalid_item_fails_alone(self):
+        users = self.create_table()
+        events = self.create_table("events", {"kind": {"type": "string"}})
+
+        response = self.write_batch([
+            {"table": "users", "records": [{"name": "alice", "age": 30}]},
+            {"table": "users", "records": [{"name": "bob", "age": "forty"}]},
+            {"table": "events", "records": [{"kind": "signup"}]},
+        ])
+
+        self.assertFalse(response.success)
+        self.assertEqual(response.error.code, "PARTIAL_WRITE")
+        self.assertEqual(response.error.details, {"failed_items": [1]})
+        items = response.data.items
+        self.assertEqual([item.success for item in items], [True, False, True])
+        self.assertEqual(items[1].table, "users")
+        self.assertEqual(items[1].error.code, "VALIDATION_ERROR")
+        self.assertIsNone(items[1].data)
+        self.assertEqual(items[0].data.records_written, 1)
+        self.assertEqual([row["name"] for row in self.stored_rows(users)], ["alice"])
+        self.assertEqual([row["kind"] for row in self.stored_rows(events)], ["signup"])
+
+    def test_missing_table_fails_only_its_items(self):
+        users = self.create_table()
+
+        response = self.write_batch([
+            {"table": "missing", "records": [{"name": "alice"}]},
+            {"table": "users", "records": [{"name": "bob", "age": 40}]},
+        ])
+
+        self.assertFalse(response.success)
+        self.assertEqual([item.success for item in response.data.items], [False, True])
+        self.assertEqual(response.data.items[0].error.code, "WRITE_ERROR")
+        self.assertEqual([row["name"] for row in self.stored_rows(users)], ["bob"])
+
+    def test_nothing_committed_is_a_plain_write_error(self):
+        self.create_table()
+
+        response = self.write_batch([
+            {"table": "users", "records": [{"name": "bob", "age": "forty"}]},
+            {"table": "missing", "records": [{"name": "alice"}]},
+        ])
+
+        self.assertFalse(response.success)
+        self.assertEqual(response.error.code, "WRITE_ERROR")
+        self.assertEqual(response.error.details, {"failed_items": [0, 1]})
+
+
+class TestTableCache(LocalIcebergTestCase):
+
+    def test_write_on_stale_handle_reloads_and_retries(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}])
+        stale_table, _ = self.ops._table_cache[table_identifier]
+        # Another container commits; the catalog rejects the next commit built
+        # on this instance's handle (as Glue's optimistic lock does)
+        other = self.ops._get_catalog().load_table(table_identifier)
+        other.append(self.ops._build_write_table(
+            [{"name": "bob", "age": 40}], self.TENANT, other.schema().as_arrow()
+        ))
+        catalog = self.ops.catalog
+        commit_table = catalog.commit_table
+        rejected = []
+
+        def reject_stale_commit(table, requirements, updates):
+            if table.metadata_location != catalog._locations[table_identifier]:
+                rejected.append(table)
+                raise CommitFailedException("metadata location changed")
+            return commit_table(table, requirements, updates)
+
+        with patch.object(catalog, "commit_table", side_effect=reject_stale_commit):
+            self.write([{"name": "carol", "age": 50}])
+
+        self.assertTrue(rejected)
+        names = sorted(row["name"] for row in self.stored_rows(table_identifier))
+        self.assertEqual(names, ["alice", "bob", "carol"])
+        cached_table, _ = self.ops._table_cache[table_identifier]
+        self.assertEqual(len(cached_table.metadata.snapshots), 3)
+
+    def test_commit_conflict_retries_once_on_a_reloaded_handle(self):
+        table_identifier = self.create_table()
+        stale_table = self.ops._load_table_cached(table_identifier)
+        attempts = []
+
+        def commit(table):
+            attempts.append(table)
+            if len(attempts) == 1:
+                raise CommitFailedException("metadata location changed")
+
+        table = self.ops._commit_with_retry(table_identifier, stale_table, commit)
+
+        self.assertEqual(len(attempts), 2)
+        self.assertIsNot(attempts[1], stale_table)
+        self.assertIs(self.ops._table_cache[table_identifier][0], table)
+
+    def test_read_modify_write_conflict_is_not_retried(self):
+        table_identifier = self.create_table()
+        table = self.ops._load_table_cached(table_identifier)
+        attempts = []
+
+        def commit(table):
+            attempts.append(table)
+            raise CommitFailedException("metadata location changed")
+
+        with self.assertRaises(CommitFailedException):
+            self.ops._commit_with_retry(table_identifier, table, commit, retry=False)
+        self.assertEqual(len(attempts), 1)
+        self.assertNotIn(table_identifier, self.ops._table_cache)
+
+    def test_second_commit_conflict_evicts_and_raises(self):
+        table_identifier = self.create_table()
+        table = self.ops._load_table_cached(table_identifier)
+
+        def commit(table):
+            raise CommitFailedException("metadata location changed")
+
+        with self.assertRaises(CommitFailedException):
+            self.ops._commit_with_retry(table_identifier, table, commit)
+        self.assertNotIn(table_identifier, self.ops._table_cache)
+
+    def test_metadata_ttl_only_grows_for_queries(self):
+        table_identifier = self.create_table()
+        metadata_path = self.ops._get_metadata_path(table_identifier)
+
+        def revalidate(adaptive_ttl):
+            # Expire the entry, then look the (unchanged) path up again
+            path, cached_time, ttl = self.ops._metadata_cache[table_identifier]
+            self.ops._metadata_cache[table_identifier] = (path, cached_time - ttl, ttl)
+            self.ops._get_metadata_path(table_identifier, adaptive_ttl=adaptive_ttl)
+            return self.ops._metadata_cache[table_identifier][2]
+
+        self.assertEqual(revalidate(False), self.ops._cache_ttl)
+        self.assertEqual(revalidate(True), self.ops._cache_ttl * 2)
+        self.assertEqual(revalidate(True), self.ops._cache_ttl * 4)
+
+        # A grown entry older than the base TTL is not served to other callers
+        path, cached_time, ttl = self.ops._metadata_cache[table_identifier]
+        self.ops._metadata_cache[table_identifier] = ("stale.json", cached_time - self.ops._cache_ttl, ttl)
+        self.assertEqual(self.ops._get_metadata_path(table_identifier), metadata_path)
+
+    def test_caches_evict_least_recently_used_tables(self):
+        self.ops._table_cache_max_entries = 2
+        identifiers = [self.create_table(table) for table in ("a", "b", "c")]
+        for table_identifier in identifiers:
+            table = self.ops._load_table_cached(table_identifier)
+            self.ops._get_arrow_schema(table_identifier, table)
+
+        self.assertEqual(list(self.ops._table_cache), identifiers[1:])
+        self.assertEqual(list(self.ops._arrow_schema_cache), identifiers[1:])
+
+
+class TestCompactionProbe(LocalIcebergTestCase):
+
+    def test_probe_records_hint_reported_by_later_writes(self):
+        self.ops.config.get.side_effect = lambda *keys: {
+            'enabled': True, 'opportunistic_check_interval': 1, 'min_files_to_compact': 2
+        }
+        self.create_table()
+        self.write([{"name": "alice", "age": 30}])
+        self.write([{"name": "bob", "age": 40}])
+        # The single housekeeping thread runs in order: this waits for the probes
+        self.ops._housekeeping.submit(lambda: None).result()
+
+        response = self.ops.write(WriteRequest(
+            tenant_id=self.TENANT, table="users", records=[{"name": "carol", "age": 50}]
+        ))
+
+        self.assertTrue(response.success, response.error)
+        self.assertTrue(response.data.compaction_recommended)
+        self.assertEqual(response.data.small_files_count, 2)
+
+
+class TestCompaction(LocalIcebergTestCase):
+
+    def test_rewrite_keeps_every_row_version(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}])
+        self.write([{"name": "bob", "age": 40}])
+        record_id = self.append_version(table_identifier, {"name": "alice", "age": 30}, 2)
+        self.append_version(table_identifier, {"name": "alice", "age": 30}, 3, deleted=True)
+        before = self.stored_rows(table_identifier)
+
+        response = self.ops.compact(CompactRequest(
+            tenant_id=self.TENANT, table="users", force=True, expire_snapshots=False
+        ))
+
+        self.assertTrue(response.success, response.error)
+        self.assertTrue(response.data.compacted)
+        self.assertEqual(response.data.stats.files_before, 4)
+        self.assertEqual(response.data.stats.files_after, 1)
+        after = self.stored_rows(table_identifier)
+        key = lambda row: (row["_record_id"], row["_version"])
+        self.assertEqual(sorted(after, key=key), sorted(before, key=key))
+        self.assertEqual(
+            sorted(row["_version"] for row in after if row["_record_id"] == record_id),
+            [1, 2, 3]
+        )
+
+    def compact_via_tenant_rewrite(self, overwrite_accepts_reader):
+        """Compact three small files with the file-level rewrite helpers unavailable"""
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}])
+        self.write([{"name": "bob", "age": 40}])
+        self.append_version(table_identifier, {"name": "alice", "age": 30}, 2)
+        before = self.stored_rows(table_identifier)
+        # The fallback reads through DuckDB's iceberg_scan; serve the same rows
+        # from a table macro since the iceberg extension is not available offline
+        self.ops.conn.register(
+            "iceberg_rows", self.ops._get_catalog().load_table(table_identifier).scan().to_arrow()
+        )
+        self.ops.conn.execute(
+            "CREATE MACRO iceberg_scan(location) AS TABLE SELECT * FROM iceberg_rows"
+        )
+
+        with patch('src.operations_full_iceberg._file_rewrite_supported', return_value=False), \
+                patch('src.operations_full_iceberg._overwrite_accepts_reader',
+                      return_value=overwrite_accepts_reader), \
+                patch.object(self.ops, '_rewrite_data_files') as file_rewrite, \
+                patch.object(Table, 'overwrite', autospec=True,
+                             side_effect=Table.overwrite) as overwrite:
+            response = self.ops.compact(CompactRequest(
+                tenant_id=self.TENANT, table="users", force=True, expire_snapshots=False
+            ))
+
+        file_rewrite.assert_not_called()
+        self.assertTrue(response.success, response.error)
+        self.assertTrue(response.data.compacted)
+        self.assertEqual(response.data.stats.files_before, 3)
+        self.assertEqual(response.data.stats.files_after, 1)
+        key = lambda row: (row["_record_id"], row["_version"])
+        self.assertEqual(sorted(self.stored_rows(table_identifier), key=key),
+                         sorted(before, key=key))
+        return overwrite.call_args.args[1]
+
+    def test_missing_rewrite_helpers_fall_back_to_tenant_rewrite(self):
+        compacted_data = self.compact_via_tenant_rewrite(overwrite_accepts_reader=True)
+        self.assertIsInstance(compacted_data, pa.RecordBatchReader)
+
+    def test_tenant_rewrite_materializes_for_table_only_overwrite(self):
+        compacted_data = self.compact_via_tenant_rewrite(overwrite_accepts_reader=False)
+        self.assertIsInstance(compacted_data, pa.Table)
+
+    def test_rewrite_data_errors_are_not_treated_as_missing_helpers(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}])
+        self.write([{"name": "bob", "age": 40}])
+
+        with patch('pyiceberg.io.pyarrow._dataframe_to_data_files', autospec=True,
+                   side_effect=pa.ArrowTypeError("cannot cast column 'age'")), \
+                patch.object(self.ops, '_rewrite_tenant_data') as fallback:
+            response = self.ops.compact(CompactRequest(
+                tenant_id=self.TENANT, table="users", force=True
+            ))
+
+        fallback.assert_not_called()
+        self.assertFalse(response.success)
+        self.assertEqual(response.error.code, "COMPACT_ERROR")
+        self.assertEqual(len(self.stored_rows(table_identifier)), 2)
+
+    def test_snapshot_expiry_honours_retention(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}])
+        self.write([{"name": "bob", "age": 40}])
+
+        response = self.ops.compact(CompactRequest(
+            tenant_id=self.TENANT, table="users", force=True, snapshot_retention_hours=1
+        ))
+
+        self.assertTrue(response.success, response.error)
+        # Every snapshot is minutes old, inside the one-hour retention window
+        self.assertEqual(response.data.stats.snapshots_expired, 0)
+        table = self.ops._get_catalog().load_table(table_identifier)
+        self.assertEqual(len(table.metadata.snapshots), 3)
+
+
+class TestHardDelete(LocalIcebergTestCase):
+
+    def test_requires_confirmation(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}])
+
+        response = self.ops.hard_delete(HardDeleteRequest(
+            tenant_id=self.TENANT, table="users", confirm=False,
+            filters=[{"field": "name", "operator": "eq", "value": "alice"}]
+        ))
+
+        self.assertFalse(response.success)
+        self.assertEqual(response.error.code, "CONFIRMATION_REQUIRED")
+        self.assertEqual(len(self.stored_rows(table_identifier)), 1)
+
+    def test_counts_deleted_rows_from_the_commit(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}, {"name": "bob", "age": 40}])
+        self.write([{"name": "alice", "age": 31}])
+
+        response = self.ops.hard_delete(HardDeleteRequest(
+            tenant_id=self.TENANT, table="users", confirm=True,
+            filters=[{"field": "name", "operator": "eq", "value": "alice"}]
+        ))
+
+        self.assertTrue(response.success, response.error)
+        self.assertEqual(response.data.records_deleted, 2)
+        self.assertEqual([row["name"] for row in self.stored_rows(table_identifier)], ["bob"])
+
+
+class TestQuery(LocalIcebergTestCase):
+
+    def query(self, **kwargs):
+        response = self.ops.query(QueryRequest(tenant_id=self.TENANT, table="users", **kwargs))
+        self.assertTrue(response.success, response.error)
+        return response.data.records
+
+    def test_query_reads_through_tenant_scan(self):
+        self.create_table()
+        self.write([{"name": "alice", "age": 30}, {"name": "bob", "age": 40}])
+        self.write([{"name": "carol", "age": 50}])
+        pool_size = self.ops._cursor_pool.qsize()
+
+        with patch.dict(os.environ, {"ICEBERG_SCAN_PUSHDOWN": "true"}):
+            records = self.query(sort=[{"field": "name", "order": "asc"}])
+
+        self.assertEqual([record["name"] for record in records], ["alice", "bob", "carol"])
+        self.assertEqual(self.ops._cursor_pool.qsize(), pool_size)
+
+    def test_latest_version_wins(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}, {"name": "bob", "age": 40}])
+        self.append_version(table_identifier, {"name": "alice", "age": 30}, 3, age=32)
+        self.append_version(table_identifier, {"name": "alice", "age": 30}, 2, age=31)
+
+        records = self.query(sort=[{"field": "name", "order": "asc"}])
+
+        self.assertEqual([(r["name"], r["age"], r["_version"]) for r in records],
+                         [("alice", 32, 3), ("bob", 40, 1)])
+
+    def test_deleted_latest_version_hides_older_versions(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}, {"name": "bob", "age": 40}])
+        self.append_version(table_identifier, {"name": "alice", "age": 30}, 2)
+        self.append_version(table_identifier, {"name": "alice", "age": 30}, 3, deleted=True)
+
+        records = self.query()
+
+        self.assertEqual([r["name"] for r in records], ["bob"])
+
+    def test_include_deleted_returns_the_delete_marker_only(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}])
+        self.append_version(table_identifier, {"name": "alice", "age": 30}, 2, deleted=True)
+
+        records = self.query(include_deleted=True)
+
+        self.assertEqual([(r["name"], r["_version"], r["_deleted"]) for r in records],
+                         [("alice", 2, True)])
+
+    def test_filters_apply_to_the_latest_version_only(self):
+        table_identifier = self.create_table()
+        self.write([{"name": "alice", "age": 30}])
+        # The older version matches age == 30, the latest does not
+        self.append_version(table_identifier, {"name": "alice", "age": 30}, 2, age=31)
+
+        records = self.query(filters=[{"field": "age", "operator": "eq", "value": 30}])
+
+        self.assertEqual(records, [])
+
+    def test_cursor_is_released_when_registration_fails(self):
+        self.create_table()
+        self.write([{"name": "alice", "age": 30}])
+        pool_size = self.ops._cursor_pool.qsize()
+        cursor = MagicMock()
+        cursor.register.side_effect = RuntimeError("register failed")
+
+        with patch.object(self.ops, '_acquire_cursor', return_value=cursor), \
+                patch.object(self.ops, '_release_cursor') as release:
+            response = self.ops.query(QueryRequest(tenant_id=self.TENANT, table="users"))
+
+        self.assertFalse(response.success)
+        release.assert_called_once_with(cursor)
+        self.assertEqual(self.ops._cursor_pool.qsize(), pool_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
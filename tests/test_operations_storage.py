@@ -0,0 +1,94 @@
+"""
+Behavioural tests for presigned upload URLs
+
+Presigning is local to botocore (no S3 round-trip), so a real client with
+dummy credentials produces real URLs to check.
+"""
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from pydantic import ValidationError
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models import GetUploadUrlsBatchRequest
+from src.operations_storage import StorageOperations
+
+
+def _config(**s3):
+    config = MagicMock()
+    config.s3 = {
+        'region': 'us-east-1',
+        'access_key_id': 'test-key',
+        'secret_access_key': 'test-secret',
+        'endpoint': 'http://localhost:9000',
+        'bucket_name': 'data-bucket',
+        **s3
+    }
+    return config
+
+
+class TestGetUploadUrlsBatch(unittest.TestCase):
+
+    def sign(self, files, config=None):
+        with patch('src.operations_storage.get_config', return_value=config or _config()):
+            return StorageOperations.get_upload_urls_batch(
+                GetUploadUrlsBatchRequest(tenant_id="acme", files=files)
+            )
+
+    def test_signs_every_file_in_request_order(self):
+        files = [
+            {"filename": f"doc-{i}.pdf", "content_type": "application/pdf", "expires_in": 60 + i}
+            for i in range(20)
+        ]
+
+        response = self.sign(files)
+
+        self.assertTrue(response.success, response.error)
+        items = response.data.items
+        self.assertEqual([item.file_key.rsplit("/", 1)[1] for item in items],
+                         [f"doc-{i}.pdf" for i in range(20)])
+        self.assertEqual([item.expires_in for item in items], [60 + i for i in range(20)])
+        self.assertEqual(len({item.file_key for item in items}), 20)
+        for item in items:
+            url = urlsplit(item.upload_url)
+            self.assertEqual(unquote(url.path), f"/data-bucket/{item.file_key}")
+            query = parse_qs(url.query)
+            self.assertTrue({"Signature", "X-Amz-Signature"} & query.keys(), query)
+
+    def test_keys_are_tenant_scoped_and_use_the_upload_bucket(self):
+        response = self.sign(
+            [{"filename": "a.png", "content_type": "image/png", "folder": "pids"},
+             {"filename": "b.png", "content_type": "image/png"}],
+            _config(upload_bucket_name="upload-bucket")
+        )
+
+        self.assertTrue(response.success, response.error)
+        first, second = response.data.items
+        self.assertRegex(first.file_key, r"^tenants/acme/pids/\d{4}/\d{2}/[0-9a-f-]{36}/a\.png$")
+        self.assertTrue(second.file_key.startswith("tenants/acme/uploads/"))
+        self.assertTrue(urlsplit(first.upload_url).path.startswith("/upload-bucket/"))
+
+    def test_signing_failure_is_a_storage_error(self):
+        config = _config()
+        del config.s3['bucket_name']
+
+        response = self.sign([{"filename": "a.png", "content_type": "image/png"}], config)
+
+        self.assertFalse(response.success)
+        self.assertIsNone(response.data)
+        self.assertEqual(response.error.code, "STORAGE_ERROR")
+
+    def test_batch_size_is_bounded(self):
+        file = {"filename": "a.png", "content_type": "image/png"}
+        with self.assertRaises(ValidationError):
+            GetUploadUrlsBatchRequest(tenant_id="acme", files=[])
+        with self.assertRaises(ValidationError):
+            GetUploadUrlsBatchRequest(tenant_id="acme", files=[file] * 101)
+
+
+if __name__ == '__main__':
+    unittest.main()
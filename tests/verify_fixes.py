@@ -4,6 +4,8 @@ from unittest.mock import MagicMock, patch
 import sys
 import os
 
+import pyarrow as pa
+
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -21,6 +23,8 @@ class TestFixes(unittest.TestCase):
         # Setup mocks
         mock_config.return_value = MagicMock()
         self.mock_conn = MagicMock()
+        # Pooled query cursors share the mocked connection
+        self.mock_conn.cursor.return_value = self.mock_conn
         mock_duckdb.return_value = self.mock_conn
         self.mock_catalog = MagicMock()
         mock_catalog.return_value = self.mock_catalog
@@ -31,23 +35,23 @@ class TestFixes(unittest.TestCase):
         src.operations_full_iceberg._iceberg_ops = None
         
         self.ops = FullIcebergOperations()
+        # The catalog is created lazily on first use, after the patch above has ended
+        self.ops.catalog = self.mock_catalog
         
         # Mock _get_metadata_path to return a dummy path
         self.ops._get_metadata_path = MagicMock(return_value="s3://bucket/path/metadata.json")
 
     def test_query_generates_correct_cte_sql(self):
-        """Verify that QUERY operation generates SQL with CTE and ROW_NUMBER"""
+        """Verify that QUERY operation generates SQL with a latest-version CTE"""
         req = QueryRequest(
             tenant_id="test_tenant",
             table="users",
             filters=[Filter(field="status", operator="eq", value="active")]
         )
         
-        # Mock fetchdf to return empty (we just want to check the SQL)
-        mock_df = MagicMock()
-        mock_df.to_dict.return_value = []
-        mock_df.empty = True
-        self.mock_conn.execute.return_value.fetchdf.return_value = mock_df
+        # An empty Arrow result (nbytes == 0) is enough - we just want to check the SQL
+        self.mock_conn.execute.return_value.to_arrow_table.return_value = pa.table({})
+        self.ops._try_s3_select = MagicMock(return_value=None)
         
         self.ops.query(req)
         
@@ -59,10 +63,10 @@ class TestFixes(unittest.TestCase):
         print(sql_executed)
         
         # Assertions
-        self.assertIn("WITH ranked_records AS", sql_executed)
-        self.assertIn("ROW_NUMBER() OVER (PARTITION BY _record_id ORDER BY _version DESC) as rn", sql_executed)
-        self.assertIn("WHERE rn = 1", sql_executed)
-        self.assertIn("AND _deleted IS NOT TRUE", sql_executed)
+        self.assertIn("WITH latest_records AS", sql_executed)
+        self.assertIn("SELECT arg_max(t, _version) AS r", sql_executed)
+        self.assertIn("GROUP BY _record_id", sql_executed)
+        self.assertIn("WHERE _deleted IS NOT TRUE", sql_executed)
         # Verify user filter is present (it might be in params or SQL depending on builder)
         # In our implementation, we add user filters to the outer query
         